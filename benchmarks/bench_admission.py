@@ -0,0 +1,101 @@
+"""
+Burst benchmark: Gemini admission control against a quota-limited stub
+
+Many sessions fire "AI Insights for All" batches (BULK, via generate_many)
+while a few chat sessions send questions one at a time (INTERACTIVE), all
+through GeminiClient against gemini_stub.StubGenerativeModel with a request
+quota. Compares the client without admission control (every request goes
+out, 429s are retried with backoff) with the client behind an
+AdmissionController sized under the quota, and reports the 429s the upstream
+returned, the requests that failed for the user, chat latency and the
+limiter's queue metrics.
+
+The quota window is scaled down to seconds so the run takes a few seconds;
+the ratios are what matter.
+
+Run from the repository root:
+    python benchmarks/bench_admission.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from gemini_ai_call import generate_many
+from gemini_client import GeminiClient
+from gemini_limiter import INTERACTIVE, AdmissionController, request_context
+from gemini_stub import StubGenerativeModel
+
+LATENCY = 0.2
+QUOTA, WINDOW_SECONDS = 20, 2.0          # upstream: 20 requests per 2 s = 600 per minute
+LIMITER_RPM, LIMITER_BURST_SECONDS = 400, 1.0  # rate * (burst + window) stays under the quota
+BULK_SESSIONS, BULK_PROMPTS = 8, 5
+CHAT_SESSIONS, CHAT_QUESTIONS = 3, 4
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def run(limiter):
+    stub = StubGenerativeModel(latency=LATENCY, quota=QUOTA, window_seconds=WINDOW_SECONDS)
+    client = GeminiClient(model=stub, call_deadline=30, limiter=limiter)
+    failures, chat_latencies = [], []
+    lock = threading.Lock()
+
+    def bulk_session(i):
+        prompts = {f"University {i}-{j}": f"Overview of university {i}-{j}" for j in range(BULK_PROMPTS)}
+        with request_context(session_id=f"bulk-{i}"):
+            for _, _, error in generate_many(prompts, client):
+                if error:
+                    with lock:
+                        failures.append(error)
+
+    def chat_session(i):
+        with request_context(INTERACTIVE, session_id=f"chat-{i}"):
+            for j in range(CHAT_QUESTIONS):
+                started = time.perf_counter()
+                try:
+                    client.generate_content(f"Chat {i} question {j}")
+                except Exception as e:
+                    with lock:
+                        failures.append(e)
+                with lock:
+                    chat_latencies.append(time.perf_counter() - started)
+                time.sleep(0.3)
+
+    threads = [threading.Thread(target=bulk_session, args=(i,)) for i in range(BULK_SESSIONS)]
+    threads += [threading.Thread(target=chat_session, args=(i,)) for i in range(CHAT_SESSIONS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "wall s": time.perf_counter() - started,
+        "upstream 429s": stub.rejected,
+        "user errors": len(failures),
+        "chat p50 s": percentile(chat_latencies, 0.5),
+        "chat p95 s": percentile(chat_latencies, 0.95),
+    }, limiter.stats() if limiter else {}
+
+
+def main():
+    total = BULK_SESSIONS * BULK_PROMPTS + CHAT_SESSIONS * CHAT_QUESTIONS
+    print(f"{total} requests from {BULK_SESSIONS} bulk and {CHAT_SESSIONS} chat sessions; "
+          f"upstream quota {QUOTA} per {WINDOW_SECONDS:.0f} s")
+    for name, limiter in (("no admission control", None),
+                          ("admission control", AdmissionController(LIMITER_RPM, 0, LIMITER_BURST_SECONDS))):
+        results, stats = run(limiter)
+        print(f"\n{name}")
+        for key, value in results.items():
+            print(f"  {key:<14}{value:>10.2f}" if isinstance(value, float) else f"  {key:<14}{value:>10}")
+        for key, value in stats.items():
+            print(f"  {key:<26}{value:>10.3f}" if isinstance(value, float) else f"  {key:<26}{value:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: per-search cost of the Discovery 3D cluster figure
+
+Compares
+  - px rebuild: the original path, a DataFrame copy plus px.scatter_3d over
+    every university with 25 random colours, on every search
+  - cached JSON: cluster_plot.highlight_cluster on the base figure JSON
+    built once per model version
+each alone and followed by what st.plotly_chart does with the figure
+(validate it and serialize the spec). Deterministic colours also make the
+spec identical for repeated searches of one cluster, so Streamlit can send
+it as a cached reference after the first time.
+
+Run from the repository root:
+    python benchmarks/bench_cluster_figure.py
+"""
+import random
+import sys
+import timeit
+from pathlib import Path
+
+import plotly.express as px
+import plotly.io as pio
+import plotly.tools
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from cluster_plot import HIGHLIGHT_COLOR, cluster_figure_json, highlight_cluster
+from recommender import SCORE_COLUMNS, Recommender
+
+USER_CLUSTER = 3
+
+
+def best_of(stmt, repeat=5):
+    number, _ = timeit.Timer(stmt).autorange()
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def px_rebuild(data, labels, n_clusters, user_cluster):
+    viz_data = data.copy()
+    viz_data["Cluster"] = labels
+    viz_data["Size"] = 5
+    viz_data.loc[viz_data["Cluster"] == user_cluster, "Size"] = 15
+    cluster_names = [f"Cluster {i}" for i in range(n_clusters)]
+    colors = [f"#{''.join(random.choices('0123456789ABCDEF', k=6))}" for _ in range(n_clusters)]
+    colors[user_cluster] = HIGHLIGHT_COLOR
+    viz_data["Cluster Name"] = viz_data["Cluster"].map(dict(enumerate(cluster_names)))
+    fig = px.scatter_3d(
+        viz_data, x=SCORE_COLUMNS[0], y=SCORE_COLUMNS[1], z=SCORE_COLUMNS[2],
+        color="Cluster Name", size="Size", hover_data=["University Name", "Country"],
+        color_discrete_map=dict(zip(cluster_names, colors)), opacity=0.7
+    )
+    fig.update_layout(height=700)
+    return fig
+
+
+def streamlit_spec(figure):
+    """What st.plotly_chart does with a figure or figure dict"""
+    figure = plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+
+def main():
+    recommender = Recommender.from_csv()
+    data, labels = recommender.data, recommender.cluster_model.labels
+    n_clusters = recommender.cluster_model.n_clusters
+
+    build = best_of(lambda: cluster_figure_json(data, labels, n_clusters), repeat=3)
+    figure_json = cluster_figure_json(data, labels, n_clusters)
+    rebuild = lambda: px_rebuild(data, labels, n_clusters, USER_CLUSTER)
+    overlay = lambda: highlight_cluster(figure_json, USER_CLUSTER)
+
+    print(f"{len(data):,} universities, {n_clusters} clusters; base figure built once in {build * 1e3:.0f} ms")
+    print(f"{'per search':<14}{'figure ms':>11}{'+ st.plotly_chart ms':>22}{'spec bytes':>12}")
+    for name, make in (("px rebuild", rebuild), ("cached JSON", overlay)):
+        alone = best_of(make)
+        total = best_of(lambda: streamlit_spec(make()))
+        print(f"{name:<14}{alone * 1e3:>11.1f}{total * 1e3:>22.1f}{len(streamlit_spec(make())):>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Payload benchmark: websocket bytes for the theme stylesheet per rerun
+
+Builds the ForwardMsg that st.markdown(css, unsafe_allow_html=True) enqueues
+and runs it through Streamlit's own message cache logic, for
+  - the original stylesheet (the un-minified f-string apply_custom_css used
+    to format on every rerun)
+  - utils.CUSTOM_CSS (built once at import)
+A cacheable message is sent in full on a session's first run and as a hash
+reference on every rerun after that; anything below
+global.minCachedMessageSize is sent in full every time.
+
+Run from the repository root:
+    python benchmarks/bench_css_payload.py
+"""
+import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from streamlit import config
+from streamlit.string_util import clean_text
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import create_reference_msg, populate_hash_if_needed
+
+import utils
+
+RERUNS = 20
+
+
+def original_css():
+    """The stylesheet as the old f-string produced it: CUSTOM_CSS's source, un-minified"""
+    source = Path(utils.__file__).read_text(encoding="utf-8")
+    body = re.search(r'CUSTOM_CSS = _minify_css\(f"""(.*?)"""\)', source, re.DOTALL).group(1)
+    return eval('f"""' + body + '"""', vars(utils))
+
+
+def markdown_msg(css):
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = clean_text(css)  # As st.markdown does
+    msg.delta.new_element.markdown.allow_html = True
+    populate_hash_if_needed(msg)
+    return msg
+
+
+def payload(css):
+    msg = markdown_msg(css)
+    first = msg.ByteSize()
+    rerun = create_reference_msg(msg).ByteSize() if msg.metadata.cacheable else first
+    return len(css.encode()), first, rerun, msg.metadata.cacheable
+
+
+def main():
+    original = original_css()
+    assert re.sub(r"/\*.*?\*/|\s", "", original, flags=re.DOTALL) == re.sub(r"\s", "", utils.CUSTOM_CSS), (
+        "minified stylesheet differs"
+    )
+
+    print(f"minCachedMessageSize: {int(config.get_option('global.minCachedMessageSize')):,} bytes")
+    print(f"{'stylesheet':<12}{'css bytes':>11}{'first run':>11}{'per rerun':>11}{'cacheable':>11}{f'{RERUNS} reruns':>12}")
+    for name, css in (("original", original), ("CUSTOM_CSS", utils.CUSTOM_CSS)):
+        size, first, rerun, cacheable = payload(css)
+        total = first + (RERUNS - 1) * rerun
+        print(f"{name:<12}{size:>11,}{first:>11,}{rerun:>11,}{str(cacheable):>11}{total:>12,}")
+
+
+if __name__ == "__main__":
+    main()
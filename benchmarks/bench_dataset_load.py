@@ -0,0 +1,62 @@
+"""
+Cold-start and memory benchmark: CSV parsing vs the memory-mapped Arrow cache
+
+Each mode runs in a fresh interpreter so import and page-cache effects are
+comparable. Run from the repository root:
+    python benchmarks/bench_dataset_load.py
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PY_FILES = Path(__file__).parents[1] / "py_files"
+CSV_PATH = Path(__file__).parents[1] / "datasets/clean/qs2023_worlduni_rank_cleandata.csv"
+
+CHILD = """
+import json, sys, time
+sys.path.append({py_files!r})
+import psutil
+import pandas as pd
+import pyarrow
+from dataset_store import cache_path, load_dataset
+
+process = psutil.Process()
+before = process.memory_full_info()
+start = time.perf_counter()
+if {mode!r} == "csv":
+    data = pd.read_csv({csv_path!r})
+else:
+    if {mode!r} == "arrow-build":
+        cache_path({csv_path!r}).unlink(missing_ok=True)
+    data = load_dataset({csv_path!r})
+elapsed = time.perf_counter() - start
+after = process.memory_full_info()
+print(json.dumps({{
+    "load_ms": elapsed * 1e3,
+    "frame_kb": data.memory_usage(deep=True).sum() / 1024,
+    "rss_kb": (after.rss - before.rss) / 1024,
+    "uss_kb": (after.uss - before.uss) / 1024,
+}}))
+"""
+
+
+def run(mode, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        code = CHILD.format(py_files=str(PY_FILES), csv_path=str(CSV_PATH), mode=mode)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return {key: min(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    print(f"{'mode':<14}{'load ms':>10}{'frame KiB':>12}{'+RSS KiB':>11}{'+USS KiB':>11}")
+    # arrow-build rewrites the cache, so arrow-mmap must run after it
+    for mode in ("csv", "arrow-build", "arrow-mmap"):
+        result = run(mode)
+        print(f"{mode:<14}{result['load_ms']:>10.2f}{result['frame_kb']:>12.1f}{result['rss_kb']:>11.1f}{result['uss_kb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
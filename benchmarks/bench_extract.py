@@ -0,0 +1,93 @@
+"""
+Throughput benchmark: legacy regex extraction vs the compiled PreferenceExtractor
+
+The legacy extractor is the original Discovery page version (four re.search
+calls per sentence on uncompiled patterns, country only in the
+"university in ... with" phrasing). Sentences mix that phrasing with free
+word orders the legacy patterns miss; the hit columns count sentences where
+all four preferences were recovered. Throughput is the median of RUNS passes.
+
+Run from the repository root:
+    python benchmarks/bench_extract.py
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from dataset_store import DATASET_CSV_PATH, load_dataset
+from recommender import PreferenceExtractor
+
+SENTENCES = 100_000
+RUNS = 5
+TARGET_PER_SECOND = 100_000
+
+TEMPLATES = [
+    "I want a university in the {country} with a high academic reputation of {a}, international student diversity of {d} and good employment rates around {e}.",
+    "Looking for schools in {country}: academic reputation at least {a}, diversity around {d}, employment rate {e}",
+    "Employment rate around {e} matters most, then academic reputation of {a} and international students {d}, ideally in {country}.",
+    "{country} please - academic {a}, student diversity {d}, graduate employability {e}"
+]
+
+
+def legacy_extract(sentence):
+    country_pattern = r"university in (?:the )?([A-Za-z\s]+?)(?:\s+with|\s+that)"
+    academic_reputation_pattern = r"academic reputation of (\d+)"
+    international_students_pattern = r"(?:international student diversity|diversity) of (\d+)"
+    employment_rate_pattern = r"employment rates? around (\d+)"
+
+    country_match = re.search(country_pattern, sentence, re.IGNORECASE)
+    academic_reputation_match = re.search(academic_reputation_pattern, sentence, re.IGNORECASE)
+    international_students_match = re.search(international_students_pattern, sentence, re.IGNORECASE)
+    employment_rate_match = re.search(employment_rate_pattern, sentence, re.IGNORECASE)
+
+    return {
+        "Country": country_match.group(1).strip() if country_match else None,
+        "Academic Reputation Score": float(academic_reputation_match.group(1)) if academic_reputation_match else None,
+        "International Students Ratio Score": float(international_students_match.group(1)) if international_students_match else None,
+        "Graduate Employment Rate Score": float(employment_rate_match.group(1)) if employment_rate_match else None
+    }
+
+
+def make_sentences(countries, rng):
+    picks = rng.integers(0, len(TEMPLATES), SENTENCES)
+    scores = rng.integers(0, 101, size=(SENTENCES, 3))
+    chosen = rng.choice(countries, SENTENCES)
+    return [
+        TEMPLATES[pick].format(country=country, a=a, d=d, e=e)
+        for pick, country, (a, d, e) in zip(picks, chosen, scores)
+    ]
+
+
+def run(name, extract_many, sentences):
+    rates = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        results = extract_many(sentences)
+        rates.append(len(sentences) / (time.perf_counter() - start))
+    rate = float(np.median(rates))
+    complete = sum(all(value is not None for value in result.values()) for result in results)
+    print(f"{name:<12}{rate:>16,.0f}{complete / len(sentences):>12.1%}")
+    return rate
+
+
+def main():
+    countries = [str(name) for name in load_dataset(DATASET_CSV_PATH)["Country"].dropna().unique()]
+    sentences = make_sentences(countries, np.random.default_rng(42))
+    extractor = PreferenceExtractor(countries)
+
+    print(f"{'extractor':<12}{'sentences/s':>16}{'complete':>12}")
+    run("legacy", lambda texts: [legacy_extract(text) for text in texts], sentences)
+    rate = run("compiled", extractor.extract_many, sentences)
+    if rate >= TARGET_PER_SECOND:
+        print(f"target {TARGET_PER_SECOND:,}/s: met")
+    else:
+        print(f"target {TARGET_PER_SECOND:,}/s: missed by {1 - rate / TARGET_PER_SECOND:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: per-render cost and payload of the app logo
+
+Times what one display_logo() call costs inside st.image, using Streamlit's
+own image_to_url (without a running server it does all the image work and
+skips only the media file upload):
+  - PIL: the original path, PIL.Image.open on every rerun, which st.image
+    then re-encodes to PNG
+  - cached bytes: utils.load_logo(), built once per server and passed
+    through st.image untouched: the source file's bytes (full) and a
+    downscaled thumbnail for phones
+
+Run from the repository root:
+    python benchmarks/bench_logo.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import PIL.Image
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from streamlit.elements.lib.image_utils import _pil_to_bytes, image_to_url
+from streamlit.elements.lib.layout_utils import LayoutConfig
+
+from utils import LOGO_PATH, load_logo
+
+STRETCH = LayoutConfig(width="stretch")
+
+
+def best_of(stmt, repeat=5):
+    number, _ = timeit.Timer(stmt).autorange()
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def render_pil():
+    image_to_url(PIL.Image.open(LOGO_PATH), STRETCH, False, "RGB", "auto", "logo")
+
+
+def render_bytes(logo):
+    image_to_url(logo, STRETCH, False, "RGB", "PNG", "logo")
+
+
+def main():
+    logo = load_logo()
+    pil = best_of(render_pil)
+    print(f"{'variant':<22}{'bytes':>9}{'ms/render':>11}")
+    reencoded = len(_pil_to_bytes(PIL.Image.open(LOGO_PATH), "PNG"))
+    print(f"{'PIL (re-encoded)':<22}{reencoded:>9,}{pil * 1e3:>11.3f}")
+    for name in ("full", "thumbnail"):
+        cached = best_of(lambda: render_bytes(logo[name]))
+        print(f"{'cached ' + name:<22}{len(logo[name]):>9,}{cached * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Latency and recall benchmark: cluster-then-sort vs KD-tree nearest neighbours
+
+For random preference vectors, compares
+  - cluster-sort: the original Discovery path (predict the cluster, filter its
+    rows, sort them by the three scores, take the head)
+  - cluster-table: the precomputed preference table (Recommender "cluster")
+  - kd-tree: Recommender "nearest" mode, with equal weights and with
+    WEIGHTS (one tree serves every weighting; weights apply at query time)
+against an exact brute-force nearest-neighbour scan under the same weights.
+Recall@k is the share of the exact k nearest universities each method
+returns.
+
+Run from the repository root:
+    python benchmarks/bench_nearest.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from dataset_store import DATASET_CSV_PATH, load_dataset
+from recommender import SCORE_COLUMNS, Recommender, encode_scores
+from recommender.clustering import fit_cluster_model
+
+K = 5
+QUERIES = 300
+SYNTHETIC_ROWS = (100_000, 1_000_000)
+# A lopsided Discovery slider setting (the sliders run 0.1 - 5.0)
+WEIGHTS = (5.0, 0.1, 1.5)
+
+
+def synthetic_dataset(rows, rng):
+    scores = rng.uniform(1, 100, size=(rows, len(SCORE_COLUMNS))).round(1)
+    data = pd.DataFrame(scores, columns=SCORE_COLUMNS)
+    data["Country"] = "Synthetic"
+    return data
+
+
+def cluster_sort(recommender, encoded, scores, k):
+    cluster = recommender.cluster_model.predict(encoded)[0]
+    members = np.flatnonzero(recommender.cluster_model.labels == cluster)
+    member_scores = scores[members]
+    order = np.lexsort((-member_scores[:, 2], -member_scores[:, 1], -member_scores[:, 0]))
+    return members[order[:k]]
+
+
+def exact_nearest(scores, point, k, weights=(1.0, 1.0, 1.0)):
+    distances = (np.asarray(weights) * (scores - point) ** 2).sum(axis=1)
+    return np.argpartition(distances, k)[:k].copy()  # Not a view that keeps all n indices alive
+
+
+def mean_ms(function, queries):
+    start = time.perf_counter()
+    results = [function(query) for query in queries]
+    return (time.perf_counter() - start) / len(queries) * 1e3, results
+
+
+def recall(results, truth):
+    return np.mean([len(np.intersect1d(found, expected)) / len(expected) for found, expected in zip(results, truth)])
+
+
+def run(name, data):
+    scores = data[SCORE_COLUMNS].to_numpy(dtype=np.float64)
+    build_start = time.perf_counter()
+    recommender = Recommender(data, fit_cluster_model(encode_scores(data), ""))
+    recommender.neighbors.tree  # Build the tree up front
+    build_s = time.perf_counter() - build_start
+
+    rng = np.random.default_rng(7)
+    points = rng.uniform(1, 100, size=(QUERIES, len(SCORE_COLUMNS))).round()
+    preferences = [dict(zip(SCORE_COLUMNS, point)) for point in points]
+    truth = [exact_nearest(scores, point, K) for point in points]
+    weighted_truth = [exact_nearest(scores, point, K, WEIGHTS) for point in points]
+
+    timings = {}
+    timings["cluster-sort"], found_sort = mean_ms(
+        lambda p: cluster_sort(recommender, [recommender.encode(p)], scores, K), preferences
+    )
+    timings["cluster-table"], found_table = mean_ms(lambda p: recommender.recommend(p, K).positions, preferences)
+    timings["kd-tree"], found_tree = mean_ms(lambda p: recommender.recommend(p, K, mode="nearest").positions, preferences)
+    timings["kd-tree weighted"], found_weighted = mean_ms(
+        lambda p: recommender.recommend(p, K, mode="nearest", weights=WEIGHTS).positions, preferences
+    )
+    timings["brute weighted"], _ = mean_ms(lambda point: exact_nearest(scores, point, K, WEIGHTS), points)
+    timings["brute-force"], _ = mean_ms(lambda point: exact_nearest(scores, point, K), points)
+
+    print(f"{name} ({len(data):,} rows, engine build {build_s:.1f} s)")
+    print(f"  {'method':<18}{'ms/query':>10}{'recall@' + str(K):>11}")
+    for method, found, expected in (("cluster-sort", found_sort, truth), ("cluster-table", found_table, truth),
+                                    ("kd-tree", found_tree, truth), ("kd-tree weighted", found_weighted, weighted_truth)):
+        print(f"  {method:<18}{timings[method]:>10.3f}{recall(found, expected):>11.2f}")
+    for method in ("brute-force", "brute weighted"):
+        print(f"  {method:<18}{timings[method]:>10.3f}{1.0:>11.2f}")
+
+
+def main():
+    run("QS 2023 (clean)", load_dataset(DATASET_CSV_PATH, shared=False))
+    rng = np.random.default_rng(42)
+    for rows in SYNTHETIC_ROWS:
+        run("synthetic", synthetic_dataset(rows, rng))
+
+
+if __name__ == "__main__":
+    main()
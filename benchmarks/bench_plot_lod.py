@@ -0,0 +1,84 @@
+"""
+Payload and build-time benchmark: level-of-detail plots at 1k, 50k and 500k points
+
+For synthetic datasets of each size, compares the full-detail figures with
+the plot_lod versions:
+  - 3D cluster scatter: every point vs cluster_plot.cluster_figure_json
+    (stratified sample, JSON capped), plus the per-search cost of
+    highlight_cluster and st.plotly_chart's validation/serialization
+  - score histograms: raw go.Histogram vs plot_lod.histogram_trace
+Browser render time grows with the points in the spec, so the JSON bytes are
+the proxy measured here.
+
+Run from the repository root:
+    python benchmarks/bench_plot_lod.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from cluster_plot import build_cluster_figure, cluster_figure_json, highlight_cluster
+from plot_lod import histogram_trace
+from recommender import SCORE_COLUMNS
+
+SIZES = (1_000, 50_000, 500_000)
+N_CLUSTERS = 25
+MATCHES = 5
+
+
+def synthetic_dataset(rows, rng):
+    data = pd.DataFrame(rng.uniform(1, 100, size=(rows, len(SCORE_COLUMNS))).round(1), columns=SCORE_COLUMNS)
+    data["University Name"] = [f"University {i}" for i in range(rows)]
+    data["Country"] = rng.choice(["Japan", "Germany", "United States", "Brazil"], size=rows)
+    return data, rng.integers(0, N_CLUSTERS, size=rows)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def streamlit_spec(figure):
+    """What st.plotly_chart does with a figure or figure dict"""
+    figure = plotly.tools.return_figure_from_figure_or_data(figure, validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+
+def histogram_figure(data, trace):
+    return go.Figure([trace(data[column]) for column in SCORE_COLUMNS]).to_json()
+
+
+def main():
+    rng = np.random.default_rng(42)
+    warm_up, warm_up_labels = synthetic_dataset(100, np.random.default_rng(0))
+    streamlit_spec(highlight_cluster(cluster_figure_json(warm_up, warm_up_labels, N_CLUSTERS), 0))
+
+    print(f"{'points':>8}  {'figure':<22}{'build s':>9}{'per search s':>14}{'JSON bytes':>14}")
+    for rows in SIZES:
+        data, labels = synthetic_dataset(rows, rng)
+        matches = data.iloc[:MATCHES]
+
+        full_json, full_build = timed(lambda: build_cluster_figure(data, labels, N_CLUSTERS, max_points=rows).to_json())
+        _, full_search = timed(lambda: streamlit_spec(highlight_cluster(full_json, 0, matches)))
+        lod_json, lod_build = timed(lambda: cluster_figure_json(data, labels, N_CLUSTERS))
+        _, lod_search = timed(lambda: streamlit_spec(highlight_cluster(lod_json, 0, matches)))
+        raw_hist, raw_hist_build = timed(lambda: histogram_figure(data, lambda x: go.Histogram(x=x)))
+        lod_hist, lod_hist_build = timed(lambda: histogram_figure(data, histogram_trace))
+
+        print(f"{rows:>8,}  {'3D scatter, full':<22}{full_build:>9.2f}{full_search:>14.2f}{len(full_json):>14,}")
+        print(f"{'':>8}  {'3D scatter, LOD':<22}{lod_build:>9.2f}{lod_search:>14.2f}{len(lod_json):>14,}")
+        print(f"{'':>8}  {'histograms, raw':<22}{raw_hist_build:>9.2f}{'':>14}{len(raw_hist):>14,}")
+        print(f"{'':>8}  {'histograms, LOD':<22}{lod_hist_build:>9.2f}{'':>14}{len(lod_hist):>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: legacy pd.cut recode vs the vectorized encode_scores
+
+Run from the repository root:
+    python benchmarks/bench_recode.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from recommender import ENCODED_COLUMNS, MISSING_LEVEL, SCORE_COLUMNS, encode_scores
+
+CSV_PATH = Path(__file__).parents[1] / "datasets/clean/qs2023_worlduni_rank_cleandata.csv"
+
+
+def legacy_recode(data):
+    """The original utils.recode_columns: three pd.cut passes plus three label maps"""
+    ranges = [0, 20, 40, 60, 80, 100]
+    labels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+    map_dict = {label: code for code, label in enumerate(labels)}
+
+    for column, encoded_column in zip(SCORE_COLUMNS, ENCODED_COLUMNS):
+        data[encoded_column] = pd.cut(data[column], bins=ranges, include_lowest=True, labels=labels)
+    for encoded_column in ENCODED_COLUMNS:
+        data[encoded_column] = data[encoded_column].map(map_dict)
+
+    return data
+
+
+def best_of(stmt, repeat=5):
+    number, _ = timeit.Timer(stmt).autorange()
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def run(name, data):
+    # Legacy callers had to copy the frame before recoding it
+    legacy = best_of(lambda: legacy_recode(data.copy()))
+    vectorized = best_of(lambda: encode_scores(data))
+
+    expected = legacy_recode(data.copy())[ENCODED_COLUMNS].to_numpy(dtype=np.float64)
+    actual = encode_scores(data).astype(np.float64)
+    actual[actual == MISSING_LEVEL] = np.nan
+    assert np.array_equal(expected, actual, equal_nan=True), "encodings differ"
+
+    print(f"{name:<22}{len(data):>10,}{legacy * 1e3:>14.3f}{vectorized * 1e3:>14.3f}{legacy / vectorized:>10.1f}x")
+
+
+def main():
+    data = pd.read_csv(CSV_PATH)
+
+    rng = np.random.default_rng(42)
+    synthetic = pd.DataFrame(
+        rng.uniform(0, 100, size=(1_000_000, len(SCORE_COLUMNS))).round(1),
+        columns=SCORE_COLUMNS
+    )
+
+    print(f"{'dataset':<22}{'rows':>10}{'legacy ms':>14}{'encode ms':>14}{'speedup':>11}")
+    run("QS 2023 (clean)", data)
+    run("synthetic", synthetic)
+
+
+if __name__ == "__main__":
+    main()
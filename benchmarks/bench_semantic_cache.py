@@ -0,0 +1,85 @@
+"""
+Semantic cache benchmark: match quality per threshold and lookup latency
+
+Each cached question is paired with a follow-up that should reuse its answer
+(a paraphrase) or must not (a different topic, country, year or test). For
+each threshold prints the paraphrases answered from the cache (hit rate) and
+the different questions wrongly answered from it (false hits), then times a
+lookup against a full cache.
+
+Run from the repository root:
+    python benchmarks/bench_semantic_cache.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from semantic_cache import MAX_ENTRIES, SIMILARITY_THRESHOLD, SemanticCache
+
+# (cached question, follow-up, whether the follow-up should reuse the answer)
+PAIRS = [
+    ("visa requirements for US students", "what visa do I need for the USA", True),
+    ("visa requirements for US students", "What are the visa requirements for international students in the US?", True),
+    ("What should I include in my statement of purpose?", "what to include in a statement of purpose", True),
+    ("What's the difference between need-based and merit-based scholarships?", "need based vs merit based scholarships difference", True),
+    ("How can I improve my chances of getting into a top university?", "how to improve my chances of admission to top universities", True),
+    ("How do I choose between multiple university offers?", "choosing between university offers", True),
+    ("How can I find research opportunities as an undergraduate?", "how to find undergraduate research opportunities", True),
+    ("How important are extracurricular activities in university admissions?", "how important are extracurriculars for admission", True),
+    ("How much does it cost to study in Canada?", "What is the cost of studying in Canada?", True),
+    ("How do I write a compelling personal statement?", "tips for writing a compelling personal statement", True),
+    ("How do I prepare for a university interview?", "how should I prepare for my admissions interview", True),
+    ("What are the typical application deadlines for Fall 2026?", "application deadlines for Fall 2026", True),
+    ("what gpa do I need for MIT", "What GPA do I need for MIT?", True),
+    ("What SAT score do I need for Stanford?", "what sat score do I need for Stanford", True),
+    ("visa requirements for US students", "scholarship requirements for US students", False),
+    ("visa requirements for US students", "visa requirements for UK students", False),
+    ("How do I write a good statement of purpose?", "What should I include in my statement of purpose?", False),
+    ("What should I include in my statement of purpose?", "How long should my statement of purpose be?", False),
+    ("How can I find research opportunities as an undergraduate?", "how to find internship opportunities as an undergraduate", False),
+    ("How important are extracurricular activities in university admissions?", "How important are test scores in university admissions?", False),
+    ("cost of living in Germany for students", "visa for students in Germany", False),
+    ("How do I write a compelling personal statement?", "How do I write a compelling cover letter?", False),
+    ("How do I prepare for a university interview?", "how do I prepare for the GRE", False),
+    ("What's the difference between need-based and merit-based scholarships?", "how do I apply for merit-based scholarships", False),
+    ("What are the typical application deadlines for Fall 2026?", "application deadlines for Fall 2027", False),
+    ("Is IELTS required for Canada?", "Is TOEFL required for Canada?", False),
+    ("What GPA do I need for MIT?", "What GPA do I need for Harvard?", False),
+    ("what sat score do I need for Stanford", "What ACT score do I need for Stanford?", False),
+]
+THRESHOLDS = (0.6, 0.7, 0.75, 0.8, 0.85, 0.9)
+
+
+def evaluate(threshold):
+    hits = false_hits = 0
+    for cached, follow_up, same in PAIRS:
+        cache = SemanticCache(threshold=threshold)
+        cache.add(cached, "answer")
+        if cache.lookup(follow_up) is not None:
+            hits += same
+            false_hits += not same
+    return hits, false_hits
+
+
+def main():
+    paraphrases = sum(same for _, _, same in PAIRS)
+    different = len(PAIRS) - paraphrases
+    print(f"{paraphrases} paraphrases, {different} different questions; default threshold {SIMILARITY_THRESHOLD}")
+    print(f"{'threshold':>10}{'hit rate':>10}{'false hits':>12}")
+    for threshold in THRESHOLDS:
+        hits, false_hits = evaluate(threshold)
+        print(f"{threshold:>10.2f}{hits / paraphrases:>10.0%}{false_hits:>7} / {different}")
+
+    cache = SemanticCache()
+    questions = [cached for cached, _, _ in PAIRS]
+    for i in range(MAX_ENTRIES):
+        cache.add(f"{questions[i % len(questions)]} variant {i}", "answer")
+    number, _ = timeit.Timer(lambda: cache.lookup("what visa do I need for the USA")).autorange()
+    per_lookup = min(timeit.repeat(lambda: cache.lookup("what visa do I need for the USA"), number=number, repeat=5)) / number
+    print(f"\nlookup against {cache.stats()['entries']:,} entries: {per_lookup * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory benchmark: private dataset copies vs the shared memory-mapped dataset
+
+Starts N replica processes that each load the dataset and reports the memory
+they add once all of them are resident. The clean CSV is tiled to a larger
+synthetic size so the dataset dominates interpreter noise. Linux only (PSS).
+
+Run from the repository root:
+    python benchmarks/bench_shared_memory.py
+"""
+import multiprocessing as mp
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from dataset_store import load_dataset
+
+CSV_PATH = Path(__file__).parents[1] / "datasets/clean/qs2023_worlduni_rank_cleandata.csv"
+TILES = 200
+REPLICAS = (1, 2, 4, 8)
+
+
+def replica(csv_path, shared, barrier, results):
+    import psutil
+
+    process = psutil.Process()
+    before = process.memory_full_info()
+    data = load_dataset(csv_path, shared=shared)
+    data["Academic Reputation Score"].sum()  # Touch the pages
+    barrier.wait()  # Measure only once every replica has mapped the file
+    after = process.memory_full_info()
+    results.put(((after.uss - before.uss) / 2**20, (after.pss - before.pss) / 2**20))
+    barrier.wait()
+
+
+def run(csv_path, shared, replicas):
+    context = mp.get_context("spawn")
+    barrier = context.Barrier(replicas)
+    results = context.Queue()
+    workers = [
+        context.Process(target=replica, args=(csv_path, shared, barrier, results))
+        for _ in range(replicas)
+    ]
+    for worker in workers:
+        worker.start()
+    samples = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return sum(uss for uss, _ in samples), sum(pss for _, pss in samples)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / CSV_PATH.name
+        pd.concat([pd.read_csv(CSV_PATH)] * TILES, ignore_index=True).to_csv(csv_path, index=False)
+        load_dataset(csv_path)  # Build the Arrow cache once
+        rows = len(load_dataset(csv_path, shared=False))
+
+        print(f"{rows:,} rows; memory added by all replicas together (MiB)")
+        print(f"{'replicas':>9}{'private USS':>14}{'private PSS':>14}{'shared USS':>13}{'shared PSS':>13}")
+        for replicas in REPLICAS:
+            private = run(csv_path, False, replicas)
+            shared = run(csv_path, True, replicas)
+            print(f"{replicas:>9}{private[0]:>14.1f}{private[1]:>14.1f}{shared[0]:>13.1f}{shared[1]:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
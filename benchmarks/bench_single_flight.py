@@ -0,0 +1,91 @@
+"""
+Spike benchmark: coalescing identical concurrent Gemini prompts
+
+Many users click the same few popular actions at once, so their prompts are
+byte-identical and all miss the (still empty) response cache together. Sends
+that spike through CachedGenerativeModel over the shared client, its
+admission controller and gemini_stub.StubGenerativeModel, with and without
+single-flight coalescing, and reports the upstream calls and the latency
+users saw.
+
+Run from the repository root:
+    python benchmarks/bench_single_flight.py
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from gemini_cache import CachedGenerativeModel, ResponseCache
+from gemini_client import GeminiClient
+from gemini_limiter import AdmissionController, request_context
+from gemini_stub import StubGenerativeModel
+from single_flight import Flight, SingleFlight
+
+LATENCY = 0.5
+POPULAR_PROMPTS = (
+    "What are the most important factors in choosing a university?",
+    "Find external scholarship resources for international students",
+    "Give an overview of Kyoto University",
+)
+USERS_PER_PROMPT = 10
+LIMITER_RPM, LIMITER_BURST_SECONDS = 600, 1.0
+
+
+class NoCoalescing(SingleFlight):
+    """Every caller leads its own flight"""
+
+    def join(self, key):
+        return Flight(), True
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(flights, cache_dir):
+    stub = StubGenerativeModel(latency=LATENCY)
+    client = GeminiClient(model=stub, limiter=AdmissionController(LIMITER_RPM, 0, LIMITER_BURST_SECONDS))
+    model = CachedGenerativeModel(client, ResponseCache(Path(cache_dir) / "responses.sqlite3"), flights)
+    latencies, texts = [], set()
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(POPULAR_PROMPTS) * USERS_PER_PROMPT)
+
+    def user(prompt, session):
+        barrier.wait()
+        started = time.perf_counter()
+        with request_context(session_id=session):
+            text = model.generate_content(prompt).text
+        with lock:
+            latencies.append(time.perf_counter() - started)
+            texts.add(text)
+
+    threads = [
+        threading.Thread(target=user, args=(prompt, f"user-{i}-{j}"))
+        for i, prompt in enumerate(POPULAR_PROMPTS) for j in range(USERS_PER_PROMPT)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(texts) == len(POPULAR_PROMPTS)
+    return stub.calls, percentile(latencies, 0.5), percentile(latencies, 0.95), max(latencies)
+
+
+def main():
+    users = len(POPULAR_PROMPTS) * USERS_PER_PROMPT
+    print(f"{users} users, {len(POPULAR_PROMPTS)} distinct prompts, upstream latency {LATENCY} s, "
+          f"admission {LIMITER_RPM} rpm")
+    print(f"{'':<16}{'upstream calls':>16}{'p50 s':>8}{'p95 s':>8}{'max s':>8}")
+    for name, flights in (("no coalescing", NoCoalescing()), ("single-flight", SingleFlight())):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            calls, p50, p95, worst = run(flights, cache_dir)
+        print(f"{name:<16}{calls:>16}{p50:>8.2f}{p95:>8.2f}{worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: full sort vs argpartition top-k over the precomputed rank
+
+Candidate sets of 1k to 1M rows are ranked by the three Discovery scores
+with the original DataFrame.sort_values(...).head(k), a full np.lexsort, and
+recommender.top_k over the lexicographic rank computed once per dataset.
+
+Run from the repository root:
+    python benchmarks/bench_topk.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from recommender import SCORE_COLUMNS, lexicographic_rank, top_k
+
+CANDIDATES = (1_000, 10_000, 100_000, 1_000_000)
+KS = (5, 50)
+
+
+def best_of(stmt, repeat=5):
+    number, _ = timeit.Timer(stmt).autorange()
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def sort_values_head(frame, k):
+    return frame.sort_values(by=SCORE_COLUMNS, ascending=False).head(k).index.to_numpy()
+
+
+def lexsort_head(scores, k):
+    return np.lexsort((-scores[:, 2], -scores[:, 1], -scores[:, 0]))[:k]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'candidates':>11}{'k':>5}{'sort_values ms':>16}{'lexsort ms':>12}{'top_k ms':>10}{'speedup':>10}")
+    for rows in CANDIDATES:
+        # One decimal like the QS scores, so ties are frequent
+        scores = rng.uniform(1, 100, size=(rows, len(SCORE_COLUMNS))).round(1)
+        frame = pd.DataFrame(scores, columns=SCORE_COLUMNS)
+        rank = lexicographic_rank(scores)  # Once per dataset, not per query
+        candidates = np.arange(rows)
+
+        for k in KS:
+            expected = sort_values_head(frame, k)
+            assert np.array_equal(expected, lexsort_head(scores, k)), "lexsort differs"
+            assert np.array_equal(expected, top_k(candidates, rank, k)), "top_k differs"
+
+            sort_values = best_of(lambda: sort_values_head(frame, k))
+            lexsort = best_of(lambda: lexsort_head(scores, k))
+            partial = best_of(lambda: top_k(candidates, rank, k))
+            print(f"{rows:>11,}{k:>5}{sort_values * 1e3:>16.3f}{lexsort * 1e3:>12.3f}{partial * 1e3:>10.3f}{sort_values / partial:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Deterministic behaviour checks for the Gemini request path
+
+Runs the limiter and client against gemini_stub.StubGenerativeModel with no
+network and no API key, and fails with an AssertionError on the first broken
+expectation:
+  - a cold batch within the per-minute quota is admitted without queueing,
+    and the request past the quota is not
+  - callers coalesced onto a failing leader all receive its error
+  - a failed leader releases its key (plain and streamed), caches nothing,
+    and the next caller starts a fresh flight
+  - queued requests are admitted interactive first, then one per session
+    in turn
+
+Run from the repository root:
+    python benchmarks/check_gemini.py
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parents[1] / "py_files"))
+
+from gemini_ai_call import generate_many
+from gemini_cache import CachedGenerativeModel, ResponseCache, cache_key
+from gemini_client import GeminiClient
+from gemini_limiter import (
+    BULK,
+    INTERACTIVE,
+    REQUESTS_PER_MINUTE,
+    AdmissionController,
+    AdmissionTimeout,
+    estimate_tokens,
+    request_context
+)
+from gemini_stub import StubGenerativeModel
+
+# Longest queueing that still counts as admitted at once; a paced request waits seconds
+IMMEDIATE_SECONDS = 0.5
+FOLLOWERS = 4
+
+
+class UpstreamError(Exception):
+    """Non-retryable failure raised by the stub"""
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it holds; the checks wait on state, never on sleeps alone"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the expected state")
+        time.sleep(0.001)
+
+
+def cached_stub(cache_dir, reply):
+    stub = StubGenerativeModel(latency=0, reply=reply)
+    return stub, CachedGenerativeModel(stub, ResponseCache(Path(cache_dir) / "responses.sqlite3"))
+
+
+def check_cold_batch_admitted_at_once():
+    limiter = AdmissionController()
+    client = GeminiClient(model=StubGenerativeModel(latency=0), limiter=limiter)
+    prompts = {f"prompt {i}": f"Overview of university {i}" for i in range(int(REQUESTS_PER_MINUTE))}
+
+    results = list(generate_many(prompts, client))
+    assert all(error is None for _, _, error in results), results
+    stats = limiter.stats()
+    assert stats["admitted"] == len(prompts)
+    # p95 of this many waits is the longest one
+    assert stats["bulk_wait_p95"] < IMMEDIATE_SECONDS, f"a request queued for {stats['bulk_wait_p95']:.2f}s"
+
+    # The quota is spent: the next request has to wait for the refill
+    try:
+        limiter.acquire(estimate_tokens("one more"), timeout=0.1)
+    except AdmissionTimeout:
+        pass
+    else:
+        raise AssertionError("request past the per-minute quota was admitted at once")
+
+
+def check_leader_error_reaches_followers():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        error = UpstreamError("upstream failed")
+
+        def reply(prompt):
+            # The leader fails only once every follower is waiting on it
+            wait_until(lambda: model.flights.stats()["followers"] == FOLLOWERS)
+            raise error
+
+        stub, model = cached_stub(cache_dir, reply)
+        raised = []
+
+        def caller():
+            try:
+                model.generate_content("same prompt")
+            except UpstreamError as e:
+                raised.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(FOLLOWERS + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert stub.calls == 1, f"{stub.calls} upstream calls"
+        assert len(raised) == FOLLOWERS + 1 and all(e is error for e in raised), raised
+
+
+def check_failed_leader_releases_key():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        failing = [True]
+
+        def reply(prompt):
+            if failing[0]:
+                raise UpstreamError("upstream failed")
+            return "answer"
+
+        stub, model = cached_stub(cache_dir, reply)
+        for stream in (False, True):
+            try:
+                response = model.generate_content("same prompt", stream=stream)
+                if stream:
+                    list(response)
+            except UpstreamError:
+                pass
+            else:
+                raise AssertionError("the upstream error was swallowed")
+            assert model.flights.stats()["in_flight"] == 0, f"key still held after a failed {stream=} leader"
+        assert model.cache.get(cache_key(model.model_name, "same prompt")) is None, "an error was cached"
+
+        failing[0] = False
+        assert model.generate_content("same prompt").text == "answer"
+        assert model.flights.stats()["leaders"] == 3
+        assert model.flights.stats()["in_flight"] == 0
+
+
+def check_priority_then_session_turns():
+    # One request per 0.5 s and room for one: the queue is filled long before the second admission
+    limiter = AdmissionController(requests_per_minute=120, tokens_per_minute=0, burst_seconds=0.5)
+    admitted = []
+    client = GeminiClient(model=StubGenerativeModel(latency=0, reply=lambda prompt: admitted.append(prompt) or "ok"),
+                          limiter=limiter)
+    client.generate_content("warm-up")  # Spends the bucket
+
+    def send(prompt, priority, session):
+        with request_context(priority, session):
+            client.generate_content(prompt)
+
+    queued = 0
+    threads = []
+    for prompt, priority, session in (("a1", BULK, "a"), ("a2", BULK, "a"), ("a3", BULK, "a"),
+                                      ("b1", BULK, "b"), ("b2", BULK, "b"), ("chat", INTERACTIVE, "c")):
+        threads.append(threading.Thread(target=send, args=(prompt, priority, session)))
+        threads[-1].start()
+        queued += 1
+        # Queued in exactly this order
+        wait_until(lambda: limiter.stats()["bulk_queue_depth"] + limiter.stats()["interactive_queue_depth"] == queued)
+    for thread in threads:
+        thread.join()
+
+    expected = ["warm-up", "chat", "a1", "b1", "a2", "b2", "a3"]
+    assert admitted == expected, f"admitted {admitted}, expected {expected}"
+
+
+CHECKS = [
+    check_cold_batch_admitted_at_once,
+    check_leader_error_reaches_followers,
+    check_failed_leader_releases_key,
+    check_priority_then_session_turns,
+]
+
+
+def main():
+    for check in CHECKS:
+        check()
+        print(f"ok  {check.__name__}")
+
+
+if __name__ == "__main__":
+    main()
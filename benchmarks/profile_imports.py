@@ -0,0 +1,90 @@
+"""
+Import-time profile of every page
+
+Runs each page once in Streamlit's bare mode under `python -X importtime`,
+so the profile covers the modules imported at load and any imported while
+the page renders its default state. Prints, per page, the wall time, the
+total self import time and which heavy packages were loaded at all.
+
+Run from the repository root:
+    python benchmarks/profile_imports.py            # print the profile
+    python benchmarks/profile_imports.py --write    # also save it as the baseline
+
+The saved baseline is benchmarks/importtime_baseline.txt. Absolute times
+depend on the machine; compare the heavy-package columns and the relative
+totals.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).parents[1] / "py_files"
+BASELINE_PATH = Path(__file__).parent / "importtime_baseline.txt"
+PAGES = ["Home.py"] + sorted(str(path.relative_to(APP_DIR)) for path in (APP_DIR / "pages").glob("*.py"))
+
+# Packages whose loading a page should only pay for when it uses them
+HEAVY_PACKAGES = ("google.generativeai", "sklearn", "scipy", "PIL", "plotly", "pandas", "pyarrow", "matplotlib")
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(page):
+    """Run one page under -X importtime; return (wall s, {module: (self us, cumulative us)})"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", page],
+        cwd=APP_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    if result.returncode:
+        print(f"warning: {page} exited with {result.returncode}", file=sys.stderr)
+    return wall, modules
+
+
+def heavy_cost(modules, package):
+    """Largest cumulative import time (ms) of any module in `package`, or None if it was never loaded"""
+    costs = [
+        cumulative for name, (_, cumulative) in modules.items()
+        if name == package or name.startswith(package + ".")
+    ]
+    return max(costs) / 1e3 if costs else None
+
+
+def report():
+    heavy_header = "".join(f"{name.split('.')[-1]:>13}" for name in HEAVY_PACKAGES)
+    lines = [f"{'page':<34}{'wall s':>8}{'imports ms':>12}{heavy_header}"]
+    for page in PAGES:
+        wall, modules = profile(page)
+        total_ms = sum(self_us for self_us, _ in modules.values()) / 1e3
+        heavy = "".join(
+            f"{package_ms:>11.0f}ms" if (package_ms := heavy_cost(modules, name)) is not None else f"{'-':>13}"
+            for name in HEAVY_PACKAGES
+        )
+        lines.append(f"{Path(page).stem:<34}{wall:>8.2f}{total_ms:>12.0f}{heavy}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--write", action="store_true", help=f"Save the profile to {BASELINE_PATH.name}")
+    args = parser.parse_args()
+
+    text = report()
+    print(text)
+    if args.write:
+        BASELINE_PATH.write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
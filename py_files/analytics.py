@@ -0,0 +1,106 @@
+"""
+Precomputed analytics tables for Success Insights
+
+Everything here depends only on the dataset (and the chosen weights), so the
+pages build each table once per dataset version and read from it on reruns.
+All scoring and binning is vectorized.
+"""
+import numpy as np
+
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+
+# Most to least competitive
+TIER_NAMES = (
+    "Highly Competitive",
+    "Very Competitive",
+    "Competitive",
+    "Moderately Competitive",
+    "Less Competitive"
+)
+
+# Lowest composite score of each tier but the last
+TIER_THRESHOLDS = (80.0, 60.0, 40.0, 20.0)
+
+# Default weight of each score in the composite competitiveness score
+COMPETITIVENESS_WEIGHTS = {
+    "Academic Reputation Score": 0.4,
+    "International Students Ratio Score": 0.2,
+    "Graduate Employment Rate Score": 0.4
+}
+
+TABLE_COLUMNS = ["University Name", "Country", "World Rank"] + list(COMPETITIVENESS_WEIGHTS)
+
+
+def normalize_weights(weights):
+    """
+    Validate score weights and scale them to sum to 1.
+
+    Args:
+        weights: Mapping of score column -> non-negative weight
+
+    Returns:
+        Dictionary with the same keys, weights summing to 1
+
+    Raises:
+        ValueError: If a weight is negative or all are zero
+    """
+    weights = {column: float(weight) for column, weight in weights.items()}
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Competitiveness weights must be non-negative")
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("At least one competitiveness weight must be positive")
+    return {column: weight / total for column, weight in weights.items()}
+
+
+class CompetitivenessTable:
+    """
+    Composite competitiveness score, tier and percentile of every university.
+
+    Args:
+        data: Dataset with the weighted score columns and TABLE_COLUMNS
+        weights: Score column -> weight; defaults to COMPETITIVENESS_WEIGHTS.
+            Weights are scaled to sum to 1, so the score stays on 0-100.
+
+    Attributes:
+        weights: The normalized weights
+        table: One row per university: TABLE_COLUMNS plus "Competitiveness
+            Score", "Tier" (ordered categorical, TIER_NAMES) and "Percentile"
+        tier_counts: "Tier" / "Count" of every non-empty tier, most competitive first
+    """
+
+    def __init__(self, data, weights=None):
+        self.weights = normalize_weights(COMPETITIVENESS_WEIGHTS if weights is None else weights)
+        scores = data[list(self.weights)].to_numpy(dtype=np.float64) @ np.array(list(self.weights.values()))
+        # The float32 scores carry ~1e-6 error; rounding keeps e.g. an exact 20 from reading 19.999999
+        scores = scores.round(4)
+
+        # Thresholds reached, so a missing score (NaN reaches none) is "Less Competitive"
+        reached = (scores[:, None] >= np.array(TIER_THRESHOLDS)).sum(axis=1)
+        tier_codes = len(TIER_THRESHOLDS) - reached
+
+        columns = list(dict.fromkeys(TABLE_COLUMNS + list(self.weights)))
+        table = data[columns].reset_index(drop=True)
+        table["Competitiveness Score"] = scores
+        table["Tier"] = pd.Categorical.from_codes(tier_codes, categories=TIER_NAMES, ordered=True)
+        table["Percentile"] = (table["Competitiveness Score"].rank(pct=True) * 100).round(1)
+        self.table = table
+
+        counts = np.bincount(tier_codes, minlength=len(TIER_NAMES))
+        present = np.flatnonzero(counts)
+        self.tier_counts = pd.DataFrame({
+            "Tier": pd.Categorical.from_codes(present, categories=TIER_NAMES, ordered=True),
+            "Count": counts[present]
+        })
+
+        # Highest score first, ties in dataset order, missing scores last
+        self._order = np.argsort(-scores, kind="stable")
+
+    def __len__(self):
+        return len(self.table)
+
+    def top(self, n):
+        """The n most competitive universities, highest score first"""
+        return self.table.iloc[self._order[:n]].reset_index(drop=True)
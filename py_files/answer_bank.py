@@ -0,0 +1,177 @@
+"""
+Prepared answers to the AI Assistant's suggested questions
+
+The suggested questions are fixed, so their context-free answers are
+generated ahead of time by a warm-up job and served from a small JSON bank
+without a Gemini call; only questions asked with a saved context (or typed
+freely) go to the live model. Running servers pick up a refreshed bank on
+their next lookup.
+
+Run from py_files at deploy time, and then on a schedule (cron), or let it
+loop:
+    python answer_bank.py                   # fill in missing and stale answers
+    python answer_bank.py --force           # regenerate every answer
+    python answer_bank.py --every 86400     # keep refreshing once a day
+
+An answer older than UNI_INSIGHTS_ANSWER_BANK_REFRESH seconds (default a day)
+is regenerated by the next run; until then it is still served.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from gemini_ai_call import generate_many
+from gemini_client import get_gemini_client
+
+DEFAULT_BANK_PATH = Path(os.getenv(
+    "UNI_INSIGHTS_ANSWER_BANK_PATH", Path(__file__).parents[1] / ".cache" / "answer_bank.json"
+))
+REFRESH_SECONDS = int(os.getenv("UNI_INSIGHTS_ANSWER_BANK_REFRESH", 24 * 3600))
+
+SUGGESTED_QUESTIONS = [
+    "What are the typical application deadlines for Fall 2026?",
+    "How important are extracurricular activities in university admissions?",
+    "What's the difference between need-based and merit-based scholarships?",
+    "How can I improve my chances of getting into a top university?",
+    "What should I include in my statement of purpose?",
+    "How do I choose between multiple university offers?",
+    "What are the visa requirements for international students in the US?",
+    "How can I find research opportunities as an undergraduate?",
+]
+
+
+def assistant_prompt(question, context=""):
+    """The AI Assistant's prompt for a question, personalized when a context is saved"""
+    if context:
+        return f"""
+        Context: {context}
+
+        Question: {question}
+
+        Provide a helpful, detailed, and personalized response. Be encouraging but realistic.
+        If the question is about specific universities or programs, provide factual information.
+        If giving advice, be practical and actionable.
+        """
+    return f"""
+    Question: {question}
+
+    Provide a helpful, detailed response about university applications, admissions, or student life.
+    Be encouraging but realistic. Give practical, actionable advice.
+    """
+
+
+class AnswerBank:
+    """
+    Question -> prepared answer, stored as JSON.
+
+    Args:
+        path: Bank file; a missing or unreadable file is an empty bank
+
+    The file is re-read whenever it changes on disk, so every server process
+    serves the answers of the latest warm-up run.
+    """
+
+    def __init__(self, path=DEFAULT_BANK_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._mtime = None
+
+    def _entries_now(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    self._entries = json.loads(self.path.read_text(encoding="utf-8"))["answers"]
+                except (OSError, ValueError, KeyError):
+                    self._entries = {}
+                self._mtime = mtime
+            return self._entries
+
+    def get(self, question):
+        """The prepared answer to exactly this question, or None"""
+        entry = self._entries_now().get(question)
+        return entry["answer"] if entry else None
+
+    def stale(self, questions, model_name, max_age=REFRESH_SECONDS):
+        """The questions without an answer from model_name newer than max_age seconds"""
+        entries = self._entries_now()
+        cutoff = time.time() - max_age
+        return [
+            question for question in questions
+            if question not in entries
+            or entries[question]["model"] != model_name
+            or entries[question]["generated_at"] < cutoff
+        ]
+
+    def save(self, answers, model_name):
+        """Merge question -> answer into the bank and replace the file atomically"""
+        entries = dict(self._entries_now())
+        now = time.time()
+        for question, answer in answers.items():
+            entries[question] = {"answer": answer, "model": model_name, "generated_at": now}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"answers": entries}, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def warm_up(bank, gemini_model, questions=SUGGESTED_QUESTIONS, max_age=REFRESH_SECONDS, force=False):
+    """
+    Generate the context-free answers that are missing or stale and store them.
+
+    Args:
+        bank: AnswerBank to fill
+        gemini_model: Model to ask; use the client itself, not the response
+            cache, so a refresh really asks again
+        questions: Questions to prepare
+        max_age: Answers older than this many seconds are regenerated
+        force: Regenerate every answer
+
+    Returns:
+        (answered, failed): question -> answer, question -> error
+    """
+    model_name = getattr(gemini_model, "model_name", type(gemini_model).__name__)
+    todo = list(questions) if force else bank.stale(questions, model_name, max_age)
+    answers, failures = {}, {}
+    prompts = {question: assistant_prompt(question) for question in todo}
+    for question, answer, error in generate_many(prompts, gemini_model):
+        if error:
+            failures[question] = error
+        else:
+            answers[question] = answer
+    if answers:
+        bank.save(answers, model_name)
+    return answers, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prepare answers to the AI Assistant's suggested questions")
+    parser.add_argument("--bank", type=Path, default=DEFAULT_BANK_PATH, help="Answer bank file")
+    parser.add_argument("--max-age", type=int, default=REFRESH_SECONDS, help="Regenerate answers older than this (s)")
+    parser.add_argument("--force", action="store_true", help="Regenerate every answer")
+    parser.add_argument("--every", type=int, default=None, help="Keep running, refreshing every this many seconds")
+    args = parser.parse_args(argv)
+
+    bank = AnswerBank(args.bank)
+    while True:
+        answers, failures = warm_up(bank, get_gemini_client(), max_age=args.max_age, force=args.force)
+        print(f"Prepared {len(answers)} answers, {len(failures)} failed", file=sys.stderr)
+        for question, error in failures.items():
+            print(f"  {question}: {error}", file=sys.stderr)
+        if args.every is None:
+            return 1 if failures else 0
+        args.force = False
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
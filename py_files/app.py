@@ -3,28 +3,13 @@
 # Importing the necessary packages
 import streamlit as st
 import pandas as pd
-import numpy as np
 
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error
-import matplotlib.pyplot as plt
-
-import google.generativeai as genai
-import os
 import warnings
 
 warnings.filterwarnings("ignore")
 
-from matplotlib.colors import ListedColormap
 import plotly.express as px
 
-import re
-
-import PIL.Image
-
-import random
 
 ################################################################
 
@@ -34,12 +19,17 @@ import random
 from pathlib import Path
 uni_recommend_rawdata_csv = Path(__file__).parents[1] / 'datasets/clean/qs2023_worlduni_rank_cleandata.csv'
 
-# Loading the dataset
-data = pd.read_csv(uni_recommend_rawdata_csv)
-
 # Importing the necessary functions needed to run the app
 from gemini_ai_call import *
 from gemini_api import *
+from gemini_client import get_gemini_client
+from recommender import Recommender
+from cluster_plot import cluster_palette
+from utils import display_logo
+
+# Loading the dataset and the recommendation engine (the persisted clustering model is refitted only when the dataset changes)
+recommender = Recommender.from_csv(uni_recommend_rawdata_csv)
+data = recommender.data.copy()
 
 
 # Initialize session state to store conversation history
@@ -48,39 +38,8 @@ if 'conversation_history' not in st.session_state:
 
 
 
-# Gemini API integration #1 - Calling the Gemini API
-def __get_gemini_client__() -> genai.GenerativeModel:
-    genai.configure(api_key=the_api_key)
-    gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-    return gemini_model
-   
-gemini_model = __get_gemini_client__()
-
-# Function to recode the selected features (Academic Reputation Score, International Students Ratio Score, Graduate Employment Rate Score) from the dataset for clustering/classification
-def recode_the_cols(data):
-    the_ranges = [0,20,40,60,80,100]
-    the_labels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
-    the_map_dict = {
-        'Very Low': 0,
-        'Low': 1,
-        'Medium': 2, 
-        'High': 3,
-        'Very High': 4
-    }
-
-    # Segmenting and sorting data values into bins for easy classification
-    data['Academic Reputation Score Encoded'] = pd.cut( data['Academic Reputation Score'],bins = the_ranges , include_lowest = True, labels = the_labels)
-    data['International Students Ratio Score Encoded'] = pd.cut( data['International Students Ratio Score'],bins = the_ranges , include_lowest = True, labels = the_labels)
-    data['Graduate Employment Rate Score Encoded'] = pd.cut( data['Graduate Employment Rate Score'],bins = the_ranges , include_lowest = True, labels = the_labels)
-
-    # Mapping the new codes to the new encoded columns
-    data['Academic Reputation Score Encoded'] = data['Academic Reputation Score Encoded'].map(the_map_dict)
-    data['International Students Ratio Score Encoded'] = data['International Students Ratio Score Encoded'].map(the_map_dict)
-    data['Graduate Employment Rate Score Encoded'] = data['Graduate Employment Rate Score Encoded'].map(the_map_dict)
-    
-    return data
-    
-
+# Gemini API integration #1 - The shared client (connection reuse, timeouts, retries)
+gemini_model = get_gemini_client()
 
 #------------------------ The Streamlit App starts here! --------------------------#
 
@@ -117,9 +76,7 @@ def set_background_theme():
 set_background_theme()
 
 # App Logo
-app_logo_image_path = Path(__file__).parents[1] / 'images/UR&IA.png'
-app_logo_image = PIL.Image.open(app_logo_image_path)
-st.image(app_logo_image)
+display_logo()
 
 # Title and Introduction
 # st.title("University Recommendation and Insights App")
@@ -134,90 +91,35 @@ user_text = st.text_area(
 
 user_to_click = st.button("Recommend!")
 
-# II - Natural Language Processing Feature Extraction using Regex
-
-def extract_features(sentence):
-    
-    # Defining patterns for each feature
-    country_pattern = r"university in the ([A-Za-z\s]+) with"
-    academic_reputation_pattern = r"academic reputation of (\d+)"
-    international_students_pattern = r"international student diversity of (\d+)"
-    employment_rate_pattern = r"employment rates around (\d+)"
-
-    # Extract features using regex
-    country_match = re.search(country_pattern, sentence)
-    academic_reputation_match = re.search(academic_reputation_pattern, sentence)
-    international_students_match = re.search(international_students_pattern, sentence)
-    employment_rate_match = re.search(employment_rate_pattern, sentence)
-
-    # Assign extracted values or default to None
-    extracted_features = {
-        "Country": country_match.group(1).strip() if country_match else None,
-        "Academic Reputation Score": float(academic_reputation_match.group(1)) if academic_reputation_match else None,
-        "International Students Ratio Score": float(international_students_match.group(1)) if international_students_match else None,
-        "Graduate Employment Rate Score": float(employment_rate_match.group(1)) if employment_rate_match else None
-    }
-    return extracted_features
+# II - Natural Language Processing Feature Extraction using Regex (shared with the Discovery page through the recommender's extractor)
 
 # Check for some errors here
 if user_text and user_to_click:
     with st.spinner("Processing your input..."):
-        features = extract_features(user_text)
+        features = recommender.extractor.extract(user_text)
         # st.write("Extracted Features:")
         # st.json(features)
     
     # III - Clustering Analysis
     st.subheader("Clustering Analysis")
  
-    data = recode_the_cols(data) # Creating 3 new columns with encoded to perform  our clustering
-
-    # Features for classification/clustering
-    clustering_features = data[[
-        "Academic Reputation Score Encoded",
-        "International Students Ratio Score Encoded",
-        "Graduate Employment Rate Score Encoded"
-    ]]
-    
-    data = recode_the_cols(data)
+    cluster_model = recommender.cluster_model
+    data["Cluster"] = cluster_model.labels
 
-    num_of_clusters = 25 
+    # Recommending the top 3 universities in the user's cluster (and country, when one was given)
+    if user_text:
+        try:
+            recommendation = recommender.recommend(features, k=3)
+        except ValueError:
+            st.markdown('<p style="color:white;">Please include an academic reputation, international student diversity and employment rate between 0 and 100.</p>', unsafe_allow_html=True)
+            st.stop()
 
-    kmeans = KMeans(n_clusters=num_of_clusters, random_state=42)
-    data["Cluster"] = kmeans.fit_predict(clustering_features)
+        user_cluster = recommendation.cluster
+        top_universities = recommendation.universities
 
-    # Recoding user input to allow for clustering
-    if user_text:
-        features_encoded = recode_the_cols(pd.DataFrame([features]))
-        
-        selected_features_encoded = features_encoded[[
-        "Academic Reputation Score Encoded",
-        "International Students Ratio Score Encoded",
-        "Graduate Employment Rate Score Encoded"
-        ]]
-        
-        # print(selected_features_encoded)
-
-        user_cluster = kmeans.predict(selected_features_encoded)[0]
-        
-        # Filtering by cluster and country
-        filtered_data = data[data["Cluster"] == user_cluster]
-        
-        # print(filtered_data)
-        
         # Tackling the edge case of a country not being in the dataset
-        if features["Country"]:
-            filtered_data_country = filtered_data[filtered_data["Country"].str.contains(features["Country"], case=False)]
-            
-            if len(filtered_data_country) > 0:
-                filtered_data = filtered_data_country
-            else:
-                st.markdown('<p style="color:white;">Unfortunately, no schools are available for your selected preference scores but below are other schools in different countries you can consider!</p>', unsafe_allow_html=True)
-                
-        # Recommend top universities based on clustering
-        top_universities = filtered_data.sort_values(
-            by=["Academic Reputation Score", "International Students Ratio Score", "Graduate Employment Rate Score"], 
-            ascending=False
-        ).head(3)
+        if not recommendation.country_matched:
+            st.markdown('<p style="color:white;">Unfortunately, no schools are available for your selected preference scores but below are other schools in different countries you can consider!</p>', unsafe_allow_html=True)
 
         st.write(f"Top universities for your preferences (Cluster {user_cluster}):")
         st.dataframe(top_universities[["University Name", "Country", "Academic Reputation Score","International Students Ratio Score","Graduate Employment Rate Score"]])
@@ -234,10 +136,8 @@ if user_text and user_to_click:
         f"University Cluster {i}" for i in range(1, 26)
     ]
     
-    # Generating random colors for the 25 clusters
-    colors = [
-        f"#{''.join(random.choices('0123456789ABCDEF', k=6))}" for _ in range(25)
-    ]
+    # Fixed colors for the 25 clusters, so a cluster keeps its color between runs
+    colors = cluster_palette(25)
     color_discrete_map = {name: color for name, color in zip(cluster_names, colors)}
     
     # Map numeric cluster IDs to custom names
@@ -259,7 +159,7 @@ if user_text and user_to_click:
         symbol = 'Cluster',
         size = 'Size',
         category_orders=category_orders,  # Custom order for clusters
-        color_discrete_map=color_discrete_map  # Assign random colors
+        color_discrete_map=color_discrete_map  # Assign the fixed colors
     )
     
     # Updating legend appearance
@@ -273,7 +173,7 @@ if user_text and user_to_click:
     )
     
     # Adding centroids
-    centroids = kmeans.cluster_centers_[:3] # The top 3 ###
+    centroids = cluster_model.centroids[:3] # The top 3 ###
     centroids_df = pd.DataFrame(centroids, columns=['Academic Reputation Score', 'International Students Ratio Score', 'Graduate Employment Rate Score'])
     fig.add_scatter3d(
         x=centroids_df['Academic Reputation Score'],
@@ -289,8 +189,9 @@ if user_text and user_to_click:
     
     # V - Gemini API Integration #2 - Using Gemini API to fetch additional details
     st.subheader("Additional Details")
+    the_queries = {}
     for index, row in top_universities.iterrows():
-        query = f"""
+        the_queries[row['University Name']] = f"""
                     Please provide a comprehensive overview of {row['University Name']} focusing on:
 
                         1. Top 3 Undergraduate Programs:
@@ -318,10 +219,19 @@ if user_text and user_to_click:
                         - School's acceptance rate
                         - Year Founded
                 """
-        with st.spinner(f"Fetching details for {row['University Name']}..."):
-            response = gemini_model.generate_content(query).text
-            st.write(f"### {row['University Name']}")
-            st.write(response)
+
+    # Laying out a placeholder per university, then fetching all the details at once and filling each one as it arrives
+    the_slots = {}
+    for the_uni_name in the_queries:
+        st.write(f"### {the_uni_name}")
+        the_slots[the_uni_name] = st.empty()
+        the_slots[the_uni_name].write(f"Fetching details for {the_uni_name}...")
+
+    for the_uni_name, response, error in generate_many(the_queries, gemini_model):
+        if error:
+            the_slots[the_uni_name].error(f"Could not fetch details for {the_uni_name}: {error}")
+        else:
+            the_slots[the_uni_name].write(response)
 
 # VI - User Optional Q&A
 st.subheader("Ask More Questions")
@@ -7,14 +7,10 @@ import altair as alt  # Adding Altair as a backup visualization option
 # Importing the necessary functions needed to run the app
 from gemini_ai_call import *
 from gemini_api import *
+from gemini_client import get_gemini_client
 
-# Gemini API integration #1 - Calling the Gemini API
-def __get_gemini_client__() -> genai.GenerativeModel:
-    genai.configure(api_key=the_api_key)
-    gemini_model = genai.GenerativeModel("gemini-1.5-flash")
-    return gemini_model
-
-gemini_model = __get_gemini_client__()
+# Gemini API integration #1 - The shared client (connection reuse, timeouts, retries)
+gemini_model = get_gemini_client()
 
 # Configure page settings for better presentation
 st.set_page_config(
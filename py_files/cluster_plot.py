@@ -0,0 +1,176 @@
+"""
+3D cluster figure for Discovery & Matching
+
+The figure of every university by its three Discovery scores only depends on
+the dataset and the fitted cluster model, so it is built once per model
+version and kept as plotly JSON. A search then only restyles the user's
+cluster trace (gold, larger markers) and adds the recommended universities on
+a fresh copy of that JSON instead of rebuilding the scatter. Large datasets
+are drawn from a stratified sample (plot_lod); the recommendations are always
+drawn exactly.
+
+Cluster colours come from a fixed qualitative palette, so a cluster keeps its
+colour across searches, sessions and restarts.
+"""
+import colorsys
+import json
+
+import numpy as np
+
+from lazy_imports import lazy_module
+from plot_lod import MAX_FIGURE_BYTES, MAX_PLOT_POINTS, capped_figure_json, sample_positions
+from recommender import SCORE_COLUMNS
+
+go = lazy_module("plotly.graph_objects")
+plotly_colors = lazy_module("plotly.colors")
+
+# Highlight colour of the user's cluster (utils.GOLD)
+HIGHLIGHT_COLOR = "#f0c244"
+
+BASE_MARKER_SIZE = 4
+HIGHLIGHT_MARKER_SIZE = 9
+MATCH_MARKER_SIZE = 12
+BASE_OPACITY = 0.7
+
+AXIS_TITLES = ("Academic Reputation", "International Diversity", "Employment Rate")
+
+
+def _hsv(hex_color):
+    red, green, blue = (int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    return colorsys.rgb_to_hsv(red, green, blue)
+
+
+def _is_highlight_like(hex_color, max_hue_distance=20 / 360):
+    """Whether a colour could be mistaken for the highlight gold"""
+    hue, saturation, value = _hsv(hex_color)
+    gold_hue = _hsv(HIGHLIGHT_COLOR)[0]
+    distance = min(abs(hue - gold_hue), 1 - abs(hue - gold_hue))
+    return distance <= max_hue_distance and saturation >= 0.3 and value >= 0.6
+
+
+def cluster_palette(n_clusters):
+    """
+    Fixed colour per cluster.
+
+    plotly's Alphabet palette, then Dark24, without the gold-like colours
+    that would clash with the highlight; repeats only past 45 clusters.
+
+    Args:
+        n_clusters: Number of clusters
+
+    Returns:
+        List of n_clusters hex colours, cluster i -> palette[i]
+    """
+    colors = [
+        color for color in dict.fromkeys(plotly_colors.qualitative.Alphabet + plotly_colors.qualitative.Dark24)
+        if not _is_highlight_like(color)
+    ]
+    return [colors[i % len(colors)] for i in range(n_clusters)]
+
+
+def cluster_name(cluster):
+    """Legend name of a cluster"""
+    return f"Cluster {cluster}"
+
+
+def _hovertemplate():
+    """Hover text: name, country and the three scores"""
+    return (
+        "<b>%{customdata[0]}</b> (%{customdata[1]})<br>"
+        f"{AXIS_TITLES[0]}: %{{x}}<br>{AXIS_TITLES[1]}: %{{y}}<br>{AXIS_TITLES[2]}: %{{z}}"
+        "<extra>%{fullData.name}</extra>"
+    )
+
+
+def build_cluster_figure(data, labels, n_clusters, max_points=MAX_PLOT_POINTS):
+    """
+    3D scatter of the universities, one trace per cluster.
+
+    Args:
+        data: Dataset with the three score columns, "University Name" and "Country"
+        labels: Cluster label of each row of data
+        n_clusters: Number of clusters (traces), including empty ones
+        max_points: Above this many rows, draw a stratified sample of about this size
+
+    Returns:
+        plotly Figure
+    """
+    labels = np.asarray(labels)
+    positions = sample_positions(labels, max_points)
+    sample = data.iloc[positions]
+    labels = labels[positions]
+    scores = sample[SCORE_COLUMNS].to_numpy(dtype=np.float32)
+    hover = sample[["University Name", "Country"]].astype(str).to_numpy()
+
+    traces = []
+    for cluster, color in enumerate(cluster_palette(n_clusters)):
+        rows = labels == cluster
+        traces.append(go.Scatter3d(
+            x=scores[rows, 0],
+            y=scores[rows, 1],
+            z=scores[rows, 2],
+            mode="markers",
+            name=cluster_name(cluster),
+            marker=dict(size=BASE_MARKER_SIZE, color=color),
+            opacity=BASE_OPACITY,
+            customdata=hover[rows],
+            hovertemplate=_hovertemplate()
+        ))
+
+    title = "3D University Landscape by Key Metrics"
+    if len(positions) < len(data):
+        title += f" (sample of {len(positions):,} of {len(data):,})"
+
+    figure = go.Figure(traces)
+    figure.update_layout(
+        title=title,
+        scene=dict(xaxis_title=AXIS_TITLES[0], yaxis_title=AXIS_TITLES[1], zaxis_title=AXIS_TITLES[2]),
+        legend=dict(itemsizing="constant"),
+        height=700
+    )
+    return figure
+
+
+def cluster_figure_json(data, labels, n_clusters, max_points=MAX_PLOT_POINTS, max_bytes=MAX_FIGURE_BYTES):
+    """build_cluster_figure serialized as plotly JSON of at most about max_bytes"""
+    return capped_figure_json(
+        lambda budget: build_cluster_figure(data, labels, n_clusters, budget),
+        len(data), max_points, max_bytes
+    )
+
+
+def highlight_cluster(figure_json, cluster, matches=None, color=HIGHLIGHT_COLOR):
+    """
+    Figure dict with one cluster's trace highlighted and the matches drawn on top.
+
+    Args:
+        figure_json: Output of cluster_figure_json
+        cluster: Cluster to highlight, or None for none
+        matches: Recommended universities (rows of the dataset), always drawn
+            in full whether or not the base figure is sampled
+        color: Highlight marker colour
+
+    Returns:
+        A new figure dict (the JSON is parsed per call, so callers may modify it)
+    """
+    figure = json.loads(figure_json)
+    if cluster is not None and 0 <= cluster < len(figure["data"]):
+        trace = figure["data"][cluster]
+        trace["marker"].update(color=color, size=HIGHLIGHT_MARKER_SIZE)
+        trace["opacity"] = 1.0
+        trace["name"] = f"{cluster_name(cluster)} (yours)"
+
+    if matches is not None and len(matches):
+        scores = matches[SCORE_COLUMNS].astype(float).to_numpy()
+        figure["data"].append({
+            "type": "scatter3d",
+            "mode": "markers",
+            "name": "Your matches",
+            "x": scores[:, 0].tolist(),
+            "y": scores[:, 1].tolist(),
+            "z": scores[:, 2].tolist(),
+            "marker": {"size": MATCH_MARKER_SIZE, "color": color, "symbol": "diamond", "line": {"color": "#FFFFFF", "width": 2}},
+            "customdata": matches[["University Name", "Country"]].astype(str).to_numpy().tolist(),
+            "hovertemplate": _hovertemplate()
+        })
+    return figure
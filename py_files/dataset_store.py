@@ -0,0 +1,160 @@
+"""
+Typed columnar cache of the QS World University Rankings dataset
+
+The clean CSV is parsed once into an uncompressed Arrow IPC file with a
+typed schema. Later loads memory-map that file, so every Streamlit process on
+the host reads the same page-cache pages instead of re-parsing the CSV.
+
+In shared mode (the default, disabled with UNI_INSIGHTS_SHARED_DATA=0) the
+whole frame is a read-only view of the map: the score matrix and the
+university names are never copied into a process, so memory stays flat as
+Streamlit replicas are added.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from lazy_imports import lazy_module
+
+pd = lazy_module("pandas")
+pa = lazy_module("pyarrow")
+
+# Clean dataset shipped with the app
+DATASET_CSV_PATH = Path(__file__).parents[1] / "datasets/clean/qs2023_worlduni_rank_cleandata.csv"
+
+SCORE_DTYPE = "float32"
+
+# Typed schema applied when converting the CSV
+COLUMN_DTYPES = {
+    "World Rank": "int16",
+    "University Name": "string",
+    "Country Code": "category",
+    "Country": "category",
+    "Academic Reputation Score": SCORE_DTYPE,
+    "Employer Reputation Score": SCORE_DTYPE,
+    "Faculty-Student Ratio Score": SCORE_DTYPE,
+    "Faculty Research Output Score": SCORE_DTYPE,
+    "International Faculty Ratio Score": SCORE_DTYPE,
+    "International Students Ratio Score": SCORE_DTYPE,
+    "Research Network Diversity Score": SCORE_DTYPE,
+    "Graduate Employment Rate Score": SCORE_DTYPE
+}
+
+HASH_METADATA_KEY = b"dataset_hash"
+
+SHARED_MODE_ENV = "UNI_INSIGHTS_SHARED_DATA"
+
+
+def shared_types(arrow_type):
+    """types_mapper keeping Arrow strings Arrow-backed instead of materializing Python objects"""
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def shared_mode_enabled():
+    """Whether workers should attach to the memory-mapped dataset rather than copy it"""
+    return os.getenv(SHARED_MODE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(csv_path):
+    """Location of the columnar cache for a dataset CSV"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.arrow")
+
+
+def read_csv_typed(csv_path):
+    """
+    Parse the clean CSV with the typed schema.
+
+    The stray unnamed index column left over from the cleaning notebook is dropped.
+    """
+    return pd.read_csv(
+        csv_path,
+        encoding="utf-8-sig",
+        usecols=list(COLUMN_DTYPES),
+        dtype=COLUMN_DTYPES
+    )[list(COLUMN_DTYPES)]
+
+
+def write_cache(data, path, dataset_hash):
+    """Write the typed frame as an uncompressed Arrow file, atomically"""
+    # A single record batch per column lets readers convert without concatenating
+    table = pa.Table.from_pandas(data, preserve_index=False).combine_chunks()
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        HASH_METADATA_KEY: dataset_hash.encode()
+    })
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_cache(path, shared=True):
+    """
+    Memory-map the Arrow cache.
+
+    Args:
+        path: Location of the Arrow cache
+        shared: Attach read-only to the mapped pages instead of copying them
+
+    Returns:
+        Tuple of (DataFrame, dataset hash the cache was built from)
+    """
+    # The mapping outlives the file handle for as long as any column references it
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    dataset_hash = (table.schema.metadata or {}).get(HASH_METADATA_KEY, b"").decode()
+
+    if not shared:
+        return table.to_pandas(), dataset_hash
+
+    # split_blocks keeps the float32 score columns as zero-copy views of the map
+    return table.to_pandas(split_blocks=True, types_mapper=shared_types), dataset_hash
+
+
+def load_dataset(csv_path, shared=None):
+    """
+    Load the dataset from its columnar cache, rebuilding it when the CSV changed.
+
+    Args:
+        csv_path: Path of the clean dataset CSV
+        shared: Attach to the memory-mapped cache read-only; defaults to
+            shared_mode_enabled()
+
+    Returns:
+        DataFrame with the typed schema
+    """
+    if shared is None:
+        shared = shared_mode_enabled()
+    dataset_hash = file_hash(csv_path)
+    path = cache_path(csv_path)
+
+    if path.exists():
+        try:
+            data, cached_hash = read_cache(path, shared)
+            if cached_hash == dataset_hash:
+                return data
+        except (OSError, pa.ArrowInvalid):
+            pass  # Corrupt or partial cache - rebuild below
+
+    data = read_csv_typed(csv_path)
+    try:
+        write_cache(data, path, dataset_hash)
+        data, _ = read_cache(path, shared)
+    except OSError:
+        pass  # Read-only deployments fall back to the parsed frame
+    return data
@@ -1,8 +1,18 @@
-import google.generativeai as genai
-from typing import List, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from gemini_limiter import BULK, request_context
+from lazy_imports import lazy_module
+
+# The SDK takes about a second to import; pages that never call Gemini skip it
+genai = lazy_module("google.generativeai")
+
+# Upper bound on Gemini requests one batch keeps in flight
+MAX_CONCURRENT_REQUESTS = 5
 
 # Function to query Gemini API (Text)
-def query_gemini_api(user_text: str, gemini_model: genai.GenerativeModel) -> str:
+def query_gemini_api(user_text: str, gemini_model: "genai.GenerativeModel") -> str:
     """
     Calls the Gemini API with the user's text input and returns the response.
 
@@ -17,12 +27,52 @@ def query_gemini_api(user_text: str, gemini_model: genai.GenerativeModel) -> str
         # Generate content using Gemini model's structured prompt
         response = gemini_model.generate_content(user_text)  # User's query
         
-        # Resolve the response to ensure all processing is completed
-        response.resolve()
-        
         # Return the text content from the response
-        return response
+        return response.text
 
     except Exception as e:
         # Handle and return any errors
-        return f"An error occurred: {e}"
\ No newline at end of file
+        return f"An error occurred: {e}"
+
+
+# Function to query Gemini API for several prompts at once (Text)
+def generate_many(
+    prompts: Dict[str, str],
+    gemini_model: "genai.GenerativeModel",
+    max_workers: int = MAX_CONCURRENT_REQUESTS,
+    priority: int = BULK
+) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+    """
+    Sends the prompts concurrently and yields each result as soon as it arrives.
+
+    Requests run on a bounded thread pool, so the batch takes roughly as long as
+    its slowest call instead of the sum of all calls. The requests queue for
+    admission as the caller's session, at BULK priority by default, so
+    interactive requests from other pages go first. Only the caller's thread
+    should touch Streamlit elements while iterating.
+
+    Args:
+        prompts (Dict[str, str]): Prompt per key (e.g. university name).
+        gemini_model (GenerativeModel): Initialized Gemini model instance.
+        max_workers (int): Maximum number of requests in flight.
+        priority (int): gemini_limiter priority of the requests.
+
+    Yields:
+        Tuple[str, Optional[str], Optional[Exception]]: The key, the response
+        text, and the error if that request failed.
+    """
+    if not prompts:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as pool:
+        # Each call runs in a copy of this context, which carries the session and priority to the worker
+        with request_context(priority):
+            futures = {
+                pool.submit(contextvars.copy_context().run, lambda prompt: gemini_model.generate_content(prompt).text, prompt): key
+                for key, prompt in prompts.items()
+            }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
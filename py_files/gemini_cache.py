@@ -0,0 +1,322 @@
+"""
+Disk-backed response cache for Gemini calls
+
+Responses are keyed on the model name and the whitespace-normalized prompt and
+stored in a local SQLite file shared by every Streamlit process on the host.
+Entries expire after a TTL and the least recently used ones are evicted once
+the store grows past its size budget.
+
+Cache failures (a locked, full or corrupt file) never fail a request: a
+lookup that errors is a miss and a store that errors is skipped with a
+logged warning.
+
+Run `python gemini_cache.py` to print the hit/miss counters.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from single_flight import SingleFlight
+
+DEFAULT_CACHE_PATH = Path(__file__).parents[1] / ".cache" / "gemini_responses.sqlite3"
+DEFAULT_TTL_SECONDS = int(os.getenv("UNI_INSIGHTS_GEMINI_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_BYTES = int(os.getenv("UNI_INSIGHTS_GEMINI_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Lookups whose counter and access-time updates are held back before they are written in one go
+FLUSH_EVERY = 100
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def normalize_prompt(prompt):
+    """Collapse runs of whitespace so indentation in page prompts doesn't split the cache"""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def cache_key(model_name, prompt):
+    """Stable cache key for a prompt sent to a given model"""
+    return hashlib.sha256(f"{model_name}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed TTL + LRU store of response texts.
+
+    A short-lived connection is opened per operation, so one instance is safe
+    to share between Streamlit script threads and the file between processes.
+    Lookups only read: their hit/miss counts and access times are kept in
+    memory and written with the next store, stats() call or every
+    FLUSH_EVERY lookups.
+
+    Args:
+        path: Location of the SQLite file
+        ttl_seconds: Age after which an entry is treated as missing
+        max_bytes: Total response text kept before LRU eviction
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._pending_accessed = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _record(self, name, key=None, accessed=None):
+        """Count a lookup in memory; returns whether enough are pending to flush"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self._pending_counts[name] += 1
+            if key is not None:
+                self._pending_accessed[key] = accessed
+            return sum(self._pending_counts.values()) >= FLUSH_EVERY
+
+    def _flush(self):
+        """
+        Write the pending counters and access times in their own transaction.
+
+        They leave memory only once the commit succeeds; on an error they stay
+        pending for the next flush.
+        """
+        with self._lock:
+            counts, self._pending_counts = self._pending_counts, {"hits": 0, "misses": 0}
+            accessed, self._pending_accessed = self._pending_accessed, {}
+        if not any(counts.values()) and not accessed:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    [(name, value) for name, value in counts.items() if value]
+                )
+                conn.executemany(
+                    "UPDATE responses SET accessed = MAX(accessed, ?) WHERE key = ?",
+                    [(when, key) for key, when in accessed.items()]
+                )
+        except sqlite3.Error as e:
+            # Put them back, so a failed write only delays them
+            with self._lock:
+                for name, value in counts.items():
+                    self._pending_counts[name] += value
+                for key, when in accessed.items():
+                    self._pending_accessed.setdefault(key, when)
+            logger.warning("Could not update Gemini cache counters: %s", e)
+
+    def get(self, key):
+        """Return the cached text for a key, or None on a miss, expired entry or cache error"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT text FROM responses WHERE key = ? AND created >= ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Gemini cache lookup failed, treating it as a miss: %s", e)
+            row = None
+
+        if row is None:
+            flush = self._record("misses")
+        else:
+            flush = self._record("hits", key, now)
+        if flush:
+            self._flush()
+        return None if row is None else row[0]
+
+    def put(self, key, model_name, text):
+        """Store a response, then drop expired entries and the LRU overflow (best effort)"""
+        now = time.time()
+        self._flush()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, text, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_name, text, len(text.encode()), now, now)
+                )
+                conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "  SELECT key FROM ("
+                    "    SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running FROM responses"
+                    "  ) WHERE running > ?"
+                    ")",
+                    (self.max_bytes,)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Could not store a Gemini response in the cache: %s", e)
+
+    def stats(self):
+        """Hit/miss counters for this process and for the shared store (None if it cannot be read)"""
+        stats = {"process_hits": self.hits, "process_misses": self.misses}
+        self._flush()
+        try:
+            with self._connect() as conn:
+                totals = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+                entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Could not read Gemini cache stats: %s", e)
+            return {**stats, **dict.fromkeys(("hits", "misses", "hit_rate", "entries", "bytes"))}
+
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        return {
+            **stats,
+            "hits": totals.get("hits", 0),
+            "misses": totals.get("misses", 0),
+            "hit_rate": totals.get("hits", 0) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size
+        }
+
+
+class CachedResponse:
+    """Stand-in for a GenerateContentResponse served from the cache"""
+
+    cached = True
+
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        # A cache hit streams as a single chunk
+        yield self
+
+
+class CachedGenerativeModel:
+    """
+    Wraps a GenerativeModel so identical prompts are answered from the cache.
+
+    Only plain text prompts are cached; anything with extra options
+    (generation config, multimodal parts) goes straight to the model. Streamed
+    responses are stored once the stream has been read to the end.
+
+    Concurrent misses on the same prompt are coalesced: the first one calls
+    the model and the others wait for its answer (or error) instead of sending
+    their own request. A waiting stream receives the answer as one chunk.
+    """
+
+    def __init__(self, model, cache, flights=None):
+        self.model = model
+        self.cache = cache
+        self.flights = flights if flights is not None else SingleFlight()
+        self.model_name = getattr(model, "model_name", type(model).__name__)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if kwargs or not isinstance(prompt, str):
+            return self.model.generate_content(prompt, stream=stream, **kwargs)
+
+        key = cache_key(self.model_name, prompt)
+        if stream:
+            return self._stream_and_store(key, prompt)
+
+        # Joined before the cache lookup, so no identical request can slip between the two
+        flight, leader = self.flights.join(key)
+        if not leader:
+            return self._follow(flight, prompt)
+
+        text = None
+        try:
+            text = self.cache.get(key)
+            if text is not None:
+                return CachedResponse(text)
+            response = self.model.generate_content(prompt)
+            try:
+                text = response.text
+            except ValueError:
+                pass  # Blocked or empty responses are not cached
+            if text is not None:
+                self.cache.put(key, self.model_name, text)
+        except Exception as e:
+            self.flights.finish(key, flight, error=e)
+            raise
+        finally:
+            # Stored before release, so a request arriving now hits the cache
+            self.flights.finish(key, flight, text)
+        return response
+
+    def _follow(self, flight, prompt, stream=False):
+        text = flight.wait()
+        if text is not None:
+            return CachedResponse(text)
+        # The leader got no text (blocked, or its stream was abandoned) - ask for ourselves
+        return self.model.generate_content(prompt, stream=stream)
+
+    def _stream_and_store(self, key, prompt):
+        # Joined on first iteration, so a stream that is never read never holds the key
+        flight, leader = self.flights.join(key)
+        if not leader:
+            yield from self._follow(flight, prompt, stream=True)
+            return
+
+        parts = []
+        complete = True
+        text = None
+        try:
+            text = self.cache.get(key)
+            if text is not None:
+                yield CachedResponse(text)
+                return
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    parts.append(chunk.text)
+                except ValueError:
+                    complete = False  # Chunk without text (e.g. blocked) - don't cache a partial answer
+                yield chunk
+            if complete:
+                text = "".join(parts)
+                self.cache.put(key, self.model_name, text)
+        except Exception as e:
+            self.flights.finish(key, flight, error=e)
+            raise
+        finally:
+            # Also reached when the reader stops early; the followers then ask for themselves
+            self.flights.finish(key, flight, text)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+if __name__ == "__main__":
+    for name, value in ResponseCache().stats().items():
+        print(f"{name:>15}: {value}")
@@ -0,0 +1,215 @@
+"""
+The one Gemini client every page and script uses
+
+get_gemini_client() returns a process-wide GeminiClient:
+  - the SDK is configured once and one GenerativeModel is shared, so every
+    call reuses the same keep-alive gRPC channel;
+  - every attempt carries a deadline (request_options timeout), so a stalled
+    upstream call cannot hold a Streamlit script thread indefinitely;
+  - 429 and 5xx errors (and transport timeouts) are retried with jittered
+    exponential backoff, within an overall deadline;
+  - every attempt is admitted by a shared gemini_limiter.AdmissionController
+    first, which keeps the process under its request and token budgets;
+  - latency, retry and error counters are kept in GeminiClient.metrics.
+
+The SDK is imported on the first call, not when the client is created.
+Timeouts and retries can be tuned with the UNI_INSIGHTS_GEMINI_* variables below;
+UNI_INSIGHTS_GEMINI_STUB=1 swaps the upstream for gemini_stub.StubGenerativeModel.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+
+from gemini_api import the_api_key
+from gemini_limiter import AdmissionController, AdmissionTimeout, current_request_context, estimate_tokens
+from lazy_imports import lazy_module
+
+genai = lazy_module("google.generativeai")
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+# Deadline of one attempt, and of a whole call including retries and backoff
+ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("UNI_INSIGHTS_GEMINI_TIMEOUT", "30"))
+CALL_DEADLINE_SECONDS = float(os.getenv("UNI_INSIGHTS_GEMINI_DEADLINE", "60"))
+MAX_RETRIES = int(os.getenv("UNI_INSIGHTS_GEMINI_MAX_RETRIES", "3"))
+USE_STUB = os.getenv("UNI_INSIGHTS_GEMINI_STUB", "") not in ("", "0")
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+# HTTP statuses worth retrying: rate limited or a transient server error
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Latencies kept for the percentiles in GeminiMetrics.snapshot
+LATENCY_WINDOW = 1000
+
+
+def is_retryable(error):
+    """Whether a failed call may succeed if sent again"""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_CAP_SECONDS):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class GeminiMetrics:
+    """Thread-safe call, retry, error and latency counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = Counter()
+        self.errors = Counter()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, outcome, latency=None, error=None):
+        with self._lock:
+            self.counters[outcome] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            if error is not None:
+                self.errors[type(error).__name__] += 1
+
+    def snapshot(self):
+        """Counters plus p50/p95/max latency (seconds) of recent successful attempts"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.counters)
+            stats["errors_by_type"] = dict(self.errors)
+
+        if latencies:
+            stats["latency_p50"] = latencies[len(latencies) // 2]
+            stats["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats["latency_max"] = latencies[-1]
+        return stats
+
+
+class GeminiClient:
+    """
+    Deadline- and retry-aware wrapper with the GenerativeModel calling convention.
+
+    Args:
+        model_name: Gemini model to call
+        model: Object with generate_content to call instead of the SDK model
+            (e.g. a stub); built from model_name on first use when omitted
+        attempt_timeout: Deadline of one attempt in seconds
+        call_deadline: Deadline of a call including retries and backoff
+        max_retries: Retries after the first attempt
+        limiter: AdmissionController every attempt waits for; None = no limit
+    """
+
+    def __init__(self, model_name=GEMINI_MODEL_NAME, model=None, attempt_timeout=ATTEMPT_TIMEOUT_SECONDS,
+                 call_deadline=CALL_DEADLINE_SECONDS, max_retries=MAX_RETRIES, limiter=None):
+        self._model = model
+        self.limiter = limiter
+        self._model_lock = threading.Lock()
+        self._model_name = model_name
+        self.attempt_timeout = attempt_timeout
+        self.call_deadline = call_deadline
+        self.max_retries = max_retries
+        self.metrics = GeminiMetrics()
+
+    @property
+    def model_name(self):
+        """Full model name as the SDK reports it, e.g. "models/gemini-1.5-flash" """
+        if self._model is not None:
+            return getattr(self._model, "model_name", self._model_name)
+        name = self._model_name
+        return name if name.startswith(("models/", "tunedModels/")) else f"models/{name}"
+
+    @property
+    def model(self):
+        """The underlying GenerativeModel, created (and the SDK configured) on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    genai.configure(api_key=the_api_key)
+                    self._model = genai.GenerativeModel(self._model_name)
+        return self._model
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        """
+        GenerativeModel.generate_content with a per-attempt deadline and retries.
+
+        A streamed call is only retried until the stream is opened; once chunks
+        are flowing an error is raised to the caller as is. Queueing for
+        admission counts towards the call deadline.
+
+        Raises:
+            gemini_limiter.AdmissionTimeout: If an attempt was not admitted
+                within the call deadline
+            The last error, once it is not retryable or the retries or the
+            call deadline are used up
+        """
+        model = self.model
+        request_options = dict(kwargs.pop("request_options", None) or {})
+        # The SDK's own retry would nest inside ours
+        request_options.setdefault("retry", None)
+        priority, session_id = current_request_context()
+        tokens = estimate_tokens(contents)
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            ticket = None
+            if self.limiter is not None:
+                try:
+                    ticket = self.limiter.acquire(tokens, priority, session_id,
+                                                  timeout=self.call_deadline - (time.monotonic() - started))
+                except AdmissionTimeout as e:
+                    self.metrics.record("admission_timeouts", error=e)
+                    raise
+
+            remaining = self.call_deadline - (time.monotonic() - started)
+            request_options["timeout"] = max(0.1, min(self.attempt_timeout, remaining))
+            attempt_started = time.monotonic()
+            try:
+                # With stream=True the SDK waits for the first chunk, so opening errors surface here
+                response = model.generate_content(contents, stream=stream, request_options=request_options, **kwargs)
+            except Exception as e:
+                self.metrics.record("failed_attempts", error=e)
+                delay = backoff_delay(attempt)
+                elapsed = time.monotonic() - started
+                if not is_retryable(e) or attempt >= self.max_retries or elapsed + delay >= self.call_deadline:
+                    self.metrics.record("errors")
+                    raise
+                self.metrics.record("retries")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.metrics.record("calls", latency=time.monotonic() - attempt_started)
+            # A stream's usage is only known at its end; it keeps the estimate
+            if ticket is not None and not stream:
+                usage = getattr(response, "usage_metadata", None)
+                self.limiter.settle(ticket, getattr(usage, "total_token_count", None))
+            return response
+
+    def __getattr__(self, name):
+        # Private names are never delegated, so a half-built client cannot recurse here
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_gemini_client():
+    """The process-wide GeminiClient and its admission controller (the SDK loads on the first call)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                model = None
+                if USE_STUB:
+                    from gemini_stub import StubGenerativeModel
+                    model = StubGenerativeModel()
+                _client = GeminiClient(model=model, limiter=AdmissionController())
+    return _client
@@ -0,0 +1,260 @@
+"""
+Process-wide admission control for Gemini requests
+
+Every Gemini attempt first waits for admission here, so a burst from many
+sessions is spread out under the upstream quota instead of failing with 429s:
+  - two token buckets hold the request-per-minute and token-per-minute
+    budgets (UNI_INSIGHTS_GEMINI_RPM / UNI_INSIGHTS_GEMINI_TPM, 0 = no limit),
+    each holding up to a minute's worth;
+  - waiting requests are queued per priority, INTERACTIVE before BULK, and
+    within a priority the sessions take turns, so one session's batch
+    cannot hold back everyone else;
+  - a request that cannot be admitted before its deadline raises
+    AdmissionTimeout instead of waiting indefinitely.
+
+Callers tag their requests with request_context(priority=...); the session
+defaults to the current Streamlit session.
+"""
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+REQUESTS_PER_MINUTE = float(os.getenv("UNI_INSIGHTS_GEMINI_RPM", "15"))
+TOKENS_PER_MINUTE = float(os.getenv("UNI_INSIGHTS_GEMINI_TPM", "1000000"))
+
+# Bucket capacity as seconds of budget: a full minute's quota, so a cold batch
+# that fits in the per-minute quota is admitted at once rather than paced
+BURST_SECONDS = 60.0
+
+# Expected output tokens charged up front; settled against the actual usage
+ESTIMATED_OUTPUT_TOKENS = 1000
+
+# Queue waits kept for the percentiles in AdmissionController.stats
+WAIT_WINDOW = 1000
+
+_context = contextvars.ContextVar("gemini_request_context", default=None)
+
+
+class AdmissionTimeout(TimeoutError):
+    """The request was still queued when its deadline passed"""
+
+
+def current_session_id():
+    """The running Streamlit session's id, or the thread name outside Streamlit"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else threading.current_thread().name
+
+
+@contextmanager
+def request_context(priority=INTERACTIVE, session_id=None):
+    """
+    Tag the Gemini requests made inside the block.
+
+    The session is resolved on entry, so a contextvars.copy_context() taken
+    inside the block carries it to worker threads.
+
+    Args:
+        priority: INTERACTIVE or BULK
+        session_id: Queue the requests are fair-shared under; defaults to the
+            current session
+    """
+    token = _context.set((priority, session_id or current_session_id()))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_request_context():
+    """(priority, session_id) of the calling code; INTERACTIVE and its own session by default"""
+    return _context.get() or (INTERACTIVE, current_session_id())
+
+
+def estimate_tokens(contents):
+    """Rough token count of a prompt (~4 characters per token) plus the expected output"""
+    text = contents if isinstance(contents, str) else str(contents)
+    return math.ceil(len(text) / 4) + ESTIMATED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 per second up to capacity.
+
+    A cost larger than the capacity is admitted once the bucket is full and
+    leaves it in debt, so oversized requests are slowed rather than refused.
+    """
+
+    def __init__(self, per_minute, burst_seconds=BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost):
+        """Seconds until cost can be taken (0 if it can now)"""
+        self._refill()
+        missing = min(cost, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, cost):
+        self._refill()
+        self.level -= cost
+
+    def give_back(self, amount):
+        """Return (or, if negative, additionally charge) part of an earlier cost"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    """One request's place in the queue and, once admitted, its charge"""
+
+    __slots__ = ("priority", "session_id", "tokens", "enqueued", "waited")
+
+    def __init__(self, priority, session_id, tokens):
+        self.priority = priority
+        self.session_id = session_id
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.waited = 0.0
+
+
+class AdmissionController:
+    """
+    Token-bucket rate limiter with a priority, per-session fair queue.
+
+    Args:
+        requests_per_minute: Request budget; 0 or less disables it
+        tokens_per_minute: Token budget (prompt + output); 0 or less disables it
+        burst_seconds: Bucket capacity in seconds of budget
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 burst_seconds=BURST_SECONDS):
+        self.request_bucket = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self._condition = threading.Condition()
+        # priority -> session id -> that session's tickets, sessions in turn order
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._depth = Counter()
+        self._max_depth = Counter()
+        self._counters = Counter()
+        self._waits = {priority: deque(maxlen=WAIT_WINDOW) for priority in PRIORITY_NAMES}
+
+    def _head(self):
+        """The ticket admitted next: highest priority, then the session whose turn it is"""
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            if sessions:
+                return next(iter(sessions.values()))[0]
+        return None
+
+    def _remove(self, ticket, admitted=False):
+        sessions = self._queues[ticket.priority]
+        tickets = sessions[ticket.session_id]
+        tickets.remove(ticket)
+        if not tickets:
+            del sessions[ticket.session_id]
+        elif admitted:
+            # The session had its turn; the next session goes first
+            sessions.move_to_end(ticket.session_id)
+        self._depth[ticket.priority] -= 1
+
+    def _wait_time(self, tokens):
+        waits = [0.0]
+        if self.request_bucket is not None:
+            waits.append(self.request_bucket.wait_time(1))
+        if self.token_bucket is not None:
+            waits.append(self.token_bucket.wait_time(tokens))
+        return max(waits)
+
+    def acquire(self, tokens, priority=INTERACTIVE, session_id=None, timeout=None):
+        """
+        Block until the request may be sent.
+
+        Args:
+            tokens: Estimated tokens of the request (see estimate_tokens)
+            priority: INTERACTIVE or BULK
+            session_id: Fair-queue key; defaults to the current session
+            timeout: Longest time to wait in seconds (None = no limit)
+
+        Returns:
+            The admitted Ticket; pass it to settle() once the usage is known
+
+        Raises:
+            AdmissionTimeout: If the request was not admitted within timeout
+        """
+        ticket = Ticket(priority, session_id or current_session_id(), tokens)
+        deadline = None if timeout is None else ticket.enqueued + timeout
+
+        with self._condition:
+            self._queues[priority].setdefault(ticket.session_id, deque()).append(ticket)
+            self._depth[priority] += 1
+            self._max_depth[priority] = max(self._max_depth[priority], self._depth[priority])
+
+            while True:
+                wait = None
+                if self._head() is ticket:
+                    wait = self._wait_time(tokens)
+                    if wait <= 0:
+                        break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._remove(ticket)
+                    self._counters["timeouts"] += 1
+                    self._condition.notify_all()  # The head may have changed
+                    raise AdmissionTimeout(f"Gemini request not admitted within {timeout:.1f}s")
+
+                # Only the head waits on the clock; the rest wake when a ticket leaves the queue
+                timeouts = [w for w in (wait, remaining) if w is not None]
+                self._condition.wait(min(timeouts) if timeouts else None)
+
+            self._remove(ticket, admitted=True)
+            if self.request_bucket is not None:
+                self.request_bucket.take(1)
+            if self.token_bucket is not None:
+                self.token_bucket.take(tokens)
+            ticket.waited = time.monotonic() - ticket.enqueued
+            self._counters["admitted"] += 1
+            self._waits[priority].append(ticket.waited)
+            self._condition.notify_all()
+        return ticket
+
+    def settle(self, ticket, actual_tokens):
+        """Correct the token budget once a request's actual usage is known"""
+        if self.token_bucket is None or actual_tokens is None:
+            return
+        with self._condition:
+            self.token_bucket.give_back(ticket.tokens - actual_tokens)
+            self._condition.notify_all()
+
+    def stats(self):
+        """Admitted/timed-out counts and, per priority, queue depth, peak depth and wait p50/p95 (s)"""
+        with self._condition:
+            stats = dict(self._counters)
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[priority])
+                stats[f"{name}_queue_depth"] = self._depth[priority]
+                stats[f"{name}_max_queue_depth"] = self._max_depth[priority]
+                if waits:
+                    stats[f"{name}_wait_p50"] = waits[len(waits) // 2]
+                    stats[f"{name}_wait_p95"] = waits[min(len(waits) - 1, int(len(waits) * 0.95))]
+        return stats
@@ -0,0 +1,100 @@
+"""
+Local stand-in for the Gemini API
+
+StubGenerativeModel has the generate_content calling convention of the SDK
+model, answers after a fixed latency and enforces its own request quota
+with 429 errors, so the client, limiter and caches can be exercised
+without network access or an API key.
+
+Set UNI_INSIGHTS_GEMINI_STUB=1 to run the app against it.
+"""
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+
+class StubQuotaExceeded(Exception):
+    """The stub's quota was exceeded (the upstream's 429 ResourceExhausted)"""
+    code = 429
+
+
+class StubDeadlineExceeded(Exception):
+    """The call outlived its timeout (the upstream's 504 DeadlineExceeded)"""
+    code = 504
+
+
+class StubResponse:
+    """Text and usage metadata; iterating yields the answer in word chunks"""
+
+    def __init__(self, text, prompt_tokens):
+        self.text = text
+        output_tokens = len(text.split())
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens
+        )
+
+    def __iter__(self):
+        for word in self.text.split(" "):
+            yield SimpleNamespace(text=word + " ", usage_metadata=None)
+
+
+class StubGenerativeModel:
+    """
+    Fake GenerativeModel for tests and load experiments.
+
+    Args:
+        latency: Seconds each call takes
+        quota: Calls allowed per sliding window; None = unlimited
+        window_seconds: Length of the quota window
+        reply: Callable prompt -> answer text; echoes the prompt by default
+
+    Attributes:
+        calls: Calls answered
+        rejected: Calls refused with StubQuotaExceeded
+        max_in_flight: Most calls served at the same time
+    """
+
+    model_name = "models/stub"
+
+    def __init__(self, latency=0.2, quota=None, window_seconds=60, reply=None):
+        self.latency = latency
+        self.quota = quota
+        self.window_seconds = window_seconds
+        self.reply = reply or (lambda prompt: f"Stub answer to: {prompt[:200]}")
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.max_in_flight = 0
+
+    def generate_content(self, contents, stream=False, request_options=None, **kwargs):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= self.window_seconds:
+                self._recent.popleft()
+            if self.quota is not None and len(self._recent) >= self.quota:
+                self.rejected += 1
+                raise StubQuotaExceeded("Resource has been exhausted (e.g. check quota).")
+            self._recent.append(now)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+        timeout = (request_options or {}).get("timeout")
+        try:
+            if timeout is not None and self.latency > timeout:
+                time.sleep(timeout)
+                raise StubDeadlineExceeded("Deadline Exceeded")
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        with self._lock:
+            self.calls += 1
+        prompt = contents if isinstance(contents, str) else str(contents)
+        response = StubResponse(self.reply(prompt), len(prompt) // 4)
+        return iter(response) if stream else response
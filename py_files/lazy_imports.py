@@ -0,0 +1,56 @@
+"""
+Lazy module imports for the University Insights App
+
+The Gemini SDK, scikit-learn, SciPy, Pillow, plotly, pandas and pyarrow take
+seconds to import between them, and most pages only need a few of them on
+some code paths. `lazy_module` binds a name to a stand-in that imports the
+real module on first attribute access:
+
+    genai = lazy_module("google.generativeai")   # nothing imported yet
+    genai.configure(api_key=...)                 # imported here, once
+
+Only attribute access triggers the import, so keep lazily imported names out
+of module-level expressions and evaluated annotations (quote those).
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Args:
+        name: Absolute module name, e.g. "plotly.express"
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            # import_module holds the import lock, so concurrent sessions import once
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_module(name):
+    """Return a LazyModule for `name`, or the module itself if it is already imported"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
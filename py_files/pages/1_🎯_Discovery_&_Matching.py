@@ -3,25 +3,22 @@ Page 1: University Discovery & Matching
 Smart recommendations with ML clustering and advanced filtering
 """
 import streamlit as st
-import pandas as pd
-import numpy as np
-import re
-from sklearn.cluster import KMeans
-import plotly.express as px
-import random
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parents[1]))
 
+from cluster_plot import highlight_cluster
+from gemini_ai_call import generate_many
 from utils import (
     set_page_config,
     apply_custom_css,
     display_logo,
     display_footer,
     load_university_data,
+    get_recommender,
+    get_cluster_figure_json,
     get_gemini_model,
-    recode_columns,
     initialize_session_state,
     format_country_list,
     GOLD, BLUE_DARK, BLUE_MEDIUM, BLUE_LIGHT, WHITE, GOLD_LIGHT
@@ -40,9 +37,10 @@ st.markdown(f"<p style='color: {WHITE}; text-align: center; font-size: 1.1rem;'>
 
 # Load data
 data = load_university_data()
+recommender = get_recommender()
 gemini_model = get_gemini_model()
 
-if data is None:
+if data is None or recommender is None:
     st.error("Failed to load university data. Please check the dataset path.")
     st.stop()
 
@@ -98,36 +96,43 @@ with tab2:
             key="employment_slider"
         )
 
+    match_mode = st.radio(
+        "Matching Mode",
+        ["Cluster Match", "Closest Scores"],
+        horizontal=True,
+        help="Cluster Match groups your scores into levels and ranks the best universities in your cluster. Closest Scores finds the universities whose exact scores are nearest to yours.",
+        key="match_mode"
+    )
+
+    score_weights = None
+    if match_mode == "Closest Scores":
+        with st.expander("⚖️ Score Weights"):
+            weight_col1, weight_col2, weight_col3 = st.columns(3)
+            with weight_col1:
+                academic_weight = st.slider("Academic Reputation", 0.1, 5.0, 1.0, 0.1, key="academic_weight")
+            with weight_col2:
+                intl_weight = st.slider("International Diversity", 0.1, 5.0, 1.0, 0.1, key="intl_weight")
+            with weight_col3:
+                employment_weight = st.slider("Employment Rate", 0.1, 5.0, 1.0, 0.1, key="employment_weight")
+        score_weights = [academic_weight, intl_weight, employment_weight]
+
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
         advanced_search_btn = st.button("🔍 Search with Filters", key="advanced_btn", use_container_width=True)
 
-# Feature extraction function
-def extract_features(sentence):
-    """Extract features from natural language input using regex"""
-    country_pattern = r"university in (?:the )?([A-Za-z\s]+?)(?:\s+with|\s+that)"
-    academic_reputation_pattern = r"academic reputation of (\d+)"
-    international_students_pattern = r"(?:international student diversity|diversity) of (\d+)"
-    employment_rate_pattern = r"employment rates? around (\d+)"
-
-    country_match = re.search(country_pattern, sentence, re.IGNORECASE)
-    academic_reputation_match = re.search(academic_reputation_pattern, sentence, re.IGNORECASE)
-    international_students_match = re.search(international_students_pattern, sentence, re.IGNORECASE)
-    employment_rate_match = re.search(employment_rate_pattern, sentence, re.IGNORECASE)
-
-    extracted_features = {
-        "Country": country_match.group(1).strip() if country_match else None,
-        "Academic Reputation Score": float(academic_reputation_match.group(1)) if academic_reputation_match else None,
-        "International Students Ratio Score": float(international_students_match.group(1)) if international_students_match else None,
-        "Graduate Employment Rate Score": float(employment_rate_match.group(1)) if employment_rate_match else None
-    }
-    return extracted_features
+# Prompt for the per-university AI overview
+def university_overview_prompt(university_name):
+    """Build the brief AI overview prompt for one university"""
+    return f"""Provide a brief overview (3-4 sentences) of {university_name} highlighting:
+    1. What makes it unique for international students
+    2. Its strongest academic programs
+    3. Campus culture and student life"""
 
 # Process search
 features = None
 if find_universities_btn and user_text:
     with st.spinner("🔍 Processing your preferences..."):
-        features = extract_features(user_text)
+        features = recommender.extractor.extract(user_text)
         st.session_state.user_preferences = features
 
 elif advanced_search_btn:
@@ -135,10 +140,16 @@ elif advanced_search_btn:
         "Country": None if country == "Any Country" else country,
         "Academic Reputation Score": float(academic_rep),
         "International Students Ratio Score": float(intl_students),
-        "Graduate Employment Rate Score": float(employment)
+        "Graduate Employment Rate Score": float(employment),
+        "Mode": "nearest" if match_mode == "Closest Scores" else "cluster",
+        "Weights": score_weights
     }
     st.session_state.user_preferences = features
 
+# Keep the last search on screen across reruns so the result buttons keep working
+elif st.session_state.user_preferences:
+    features = st.session_state.user_preferences
+
 # Run recommendation if features are available
 if features:
     st.markdown("<hr style='border: 1px solid #f0c244; margin: 2rem 0;'>", unsafe_allow_html=True)
@@ -166,54 +177,28 @@ if features:
 
     # Clustering Analysis
     with st.spinner("🤖 Running ML clustering analysis..."):
-        data_encoded = recode_columns(data.copy())
-
-        clustering_features = data_encoded[[
-            "Academic Reputation Score Encoded",
-            "International Students Ratio Score Encoded",
-            "Graduate Employment Rate Score Encoded"
-        ]]
-
-        num_clusters = 25
-        kmeans = KMeans(n_clusters=num_clusters, random_state=42)
-        data_encoded["Cluster"] = kmeans.fit_predict(clustering_features)
-
-        # Encode user preferences
-        features_df = pd.DataFrame([features])
-        features_encoded = recode_columns(features_df)
-
-        selected_features_encoded = features_encoded[[
-            "Academic Reputation Score Encoded",
-            "International Students Ratio Score Encoded",
-            "Graduate Employment Rate Score Encoded"
-        ]]
-
-        user_cluster = kmeans.predict(selected_features_encoded)[0]
-
-        # Filter by cluster
-        filtered_data = data_encoded[data_encoded["Cluster"] == user_cluster].copy()
-
-        # Filter by country if specified
-        if features["Country"]:
-            filtered_data_country = filtered_data[
-                filtered_data["Country"].str.contains(features["Country"], case=False, na=False)
-            ]
-
-            if len(filtered_data_country) > 0:
-                filtered_data = filtered_data_country
-            else:
-                st.warning(f"⚠️ No universities found in {features['Country']} matching your preferences. Showing similar universities from other countries.")
-
-        # Get top recommendations
-        top_universities = filtered_data.sort_values(
-            by=["Academic Reputation Score", "International Students Ratio Score", "Graduate Employment Rate Score"],
-            ascending=False
-        ).head(5)
+        # Cluster labels come from the persisted model - no refit per search
+        try:
+            recommendation = recommender.recommend(
+                features,
+                mode=features.get("Mode", "cluster"),
+                weights=features.get("Weights")
+            )
+        except ValueError:
+            st.warning("⚠️ Please include all three scores (academic reputation, international diversity and employment rate) between 0 and 100.")
+            st.stop()
+
+        user_cluster = recommendation.cluster
+        top_universities = recommendation.universities
+
+        if not recommendation.country_matched:
+            st.warning(f"⚠️ No universities found in {features['Country']} matching your preferences. Showing similar universities from other countries.")
 
         st.session_state.recommended_universities = top_universities
 
     # Display Results
-    st.markdown(f"<h2 style='color: {GOLD}; margin-top: 2rem;'>🎓 Top Recommended Universities (Cluster {user_cluster})</h2>", unsafe_allow_html=True)
+    match_label = "Closest Scores" if features.get("Mode") == "nearest" else f"Cluster {user_cluster}"
+    st.markdown(f"<h2 style='color: {GOLD}; margin-top: 2rem;'>🎓 Top Recommended Universities ({match_label})</h2>", unsafe_allow_html=True)
 
     if len(top_universities) > 0:
         # Summary cards
@@ -259,10 +244,7 @@ if features:
                     if st.button(f"🔍 Get AI Insights", key=f"ai_{index}"):
                         with st.spinner(f"Fetching insights for {row['University Name']}..."):
                             if gemini_model:
-                                query = f"""Provide a brief overview (3-4 sentences) of {row['University Name']} highlighting:
-                                1. What makes it unique for international students
-                                2. Its strongest academic programs
-                                3. Campus culture and student life"""
+                                query = university_overview_prompt(row['University Name'])
 
                                 try:
                                     response = gemini_model.generate_content(query)
@@ -270,6 +252,23 @@ if features:
                                 except Exception as e:
                                     st.error(f"Error fetching AI insights: {e}")
 
+        # Fetch every overview at once; each one renders as soon as it arrives
+        if gemini_model and st.button("✨ Get AI Insights for All", key="ai_all_btn"):
+            st.markdown(f"<h3 style='color: {GOLD}; margin-top: 2rem;'>🤖 AI Insights</h3>", unsafe_allow_html=True)
+
+            insight_slots = {}
+            for university_name in top_universities["University Name"]:
+                st.markdown(f"<h4 style='color: {GOLD_LIGHT};'>{university_name}</h4>", unsafe_allow_html=True)
+                insight_slots[university_name] = st.empty()
+                insight_slots[university_name].caption("⏳ Fetching insights...")
+
+            prompts = {name: university_overview_prompt(name) for name in insight_slots}
+            for university_name, insight, error in generate_many(prompts, gemini_model):
+                if error:
+                    insight_slots[university_name].error(f"Error fetching AI insights: {error}")
+                else:
+                    insight_slots[university_name].info(insight)
+
         # Detailed comparison table
         st.markdown(f"<h3 style='color: {GOLD}; margin-top: 2rem;'>📊 Detailed Comparison</h3>", unsafe_allow_html=True)
 
@@ -293,44 +292,8 @@ if features:
     st.markdown(f"<h2 style='color: {GOLD}; margin-top: 3rem;'>📈 Cluster Visualization</h2>", unsafe_allow_html=True)
     st.markdown(f"<p style='color: {WHITE};'>3D visualization showing all universities across key metrics. Your cluster is highlighted.</p>", unsafe_allow_html=True)
 
-    # Prepare visualization data
-    viz_data = data_encoded.copy()
-    viz_data["Size"] = 5
-    viz_data.loc[viz_data["Cluster"] == user_cluster, "Size"] = 15
-    viz_data["Is Your Cluster"] = viz_data["Cluster"] == user_cluster
-
-    # Generate cluster names and colors
-    cluster_names = [f"Cluster {i}" for i in range(num_clusters)]
-    colors = [f"#{''.join(random.choices('0123456789ABCDEF', k=6))}" for _ in range(num_clusters)]
-
-    # Highlight user cluster in gold
-    colors[user_cluster] = GOLD
-
-    color_discrete_map = {name: color for name, color in zip(cluster_names, colors)}
-    viz_data['Cluster Name'] = viz_data['Cluster'].map({i: name for i, name in enumerate(cluster_names)})
-
-    # Create 3D scatter plot
-    fig = px.scatter_3d(
-        viz_data,
-        x='Academic Reputation Score',
-        y='International Students Ratio Score',
-        z='Graduate Employment Rate Score',
-        color='Cluster Name',
-        size='Size',
-        hover_data=['University Name', 'Country'],
-        title="3D University Landscape by Key Metrics",
-        color_discrete_map=color_discrete_map,
-        opacity=0.7
-    )
-
-    fig.update_layout(
-        scene=dict(
-            xaxis_title="Academic Reputation",
-            yaxis_title="International Diversity",
-            zaxis_title="Employment Rate"
-        ),
-        height=700
-    )
+    # The base figure is built once per model version; a search only restyles its cluster and adds its matches
+    fig = highlight_cluster(get_cluster_figure_json(recommender), user_cluster, matches=top_universities)
 
     st.plotly_chart(fig, use_container_width=True)
 
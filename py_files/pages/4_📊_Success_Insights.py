@@ -3,22 +3,22 @@ Page 4: Success Insights Dashboard
 Analyze acceptance rates, competitiveness, and admission trends
 """
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parents[1]))
 
+from analytics import COMPETITIVENESS_WEIGHTS
+from plot_lod import histogram_trace
 from utils import (
     set_page_config,
     apply_custom_css,
     display_logo,
     display_footer,
     load_university_data,
+    get_competitiveness_table,
     get_gemini_model,
     initialize_session_state,
     format_country_list,
@@ -105,22 +105,22 @@ with tab1:
             delta=f"Median: {median_emp:.1f}"
         )
 
-    # Distribution histograms
+    # Distribution histograms (binned on the server for large datasets)
     fig_dist = make_subplots(
         rows=1, cols=3,
         subplot_titles=('Academic Reputation', 'International Diversity', 'Employment Rate')
     )
 
     fig_dist.add_trace(
-        go.Histogram(x=data['Academic Reputation Score'], name='Academic Rep', marker_color=GOLD),
+        histogram_trace(data['Academic Reputation Score'], name='Academic Rep', marker_color=GOLD),
         row=1, col=1
     )
     fig_dist.add_trace(
-        go.Histogram(x=data['International Students Ratio Score'], name='Intl. Students', marker_color='#ff6b6b'),
+        histogram_trace(data['International Students Ratio Score'], name='Intl. Students', marker_color='#ff6b6b'),
         row=1, col=2
     )
     fig_dist.add_trace(
-        go.Histogram(x=data['Graduate Employment Rate Score'], name='Employment', marker_color='#51cf66'),
+        histogram_trace(data['Graduate Employment Rate Score'], name='Employment', marker_color='#51cf66'),
         row=1, col=3
     )
 
@@ -146,7 +146,7 @@ with tab1:
     if selected_countries:
         filtered_data = data[data['Country'].isin(selected_countries)]
 
-        country_metrics = filtered_data.groupby('Country').agg({
+        country_metrics = filtered_data.groupby('Country', observed=True).agg({
             'Academic Reputation Score': 'mean',
             'International Students Ratio Score': 'mean',
             'Graduate Employment Rate Score': 'mean'
@@ -188,43 +188,27 @@ with tab2:
     # Competitiveness tiers
     st.markdown(f"<h3 style='color: {GOLD};'>Competitiveness Tiers</h3>", unsafe_allow_html=True)
 
-    # Create competitiveness score (composite of the three key metrics)
-    data_comp = data.copy()
-    data_comp['Competitiveness Score'] = (
-        data_comp['Academic Reputation Score'] * 0.4 +
-        data_comp['International Students Ratio Score'] * 0.2 +
-        data_comp['Graduate Employment Rate Score'] * 0.4
-    )
+    # Composite of the three key metrics, with adjustable weights
+    with st.expander("⚖️ Adjust score weights"):
+        weight_cols = st.columns(len(COMPETITIVENESS_WEIGHTS))
+        weights = tuple(
+            (column, weight_col.slider(column.replace(" Score", ""), 0.0, 1.0, default, 0.05, key=f"comp_weight_{i}"))
+            for i, (weight_col, (column, default)) in enumerate(zip(weight_cols, COMPETITIVENESS_WEIGHTS.items()))
+        )
 
-    # Define tiers
-    def get_tier(score):
-        if score >= 80:
-            return "Highly Competitive"
-        elif score >= 60:
-            return "Very Competitive"
-        elif score >= 40:
-            return "Competitive"
-        elif score >= 20:
-            return "Moderately Competitive"
-        else:
-            return "Less Competitive"
-
-    data_comp['Tier'] = data_comp['Competitiveness Score'].apply(get_tier)
-
-    # Tier distribution
-    tier_counts = data_comp['Tier'].value_counts().reset_index()
-    tier_counts.columns = ['Tier', 'Count']
-
-    # Define tier order
-    tier_order = ["Highly Competitive", "Very Competitive", "Competitive", "Moderately Competitive", "Less Competitive"]
-    tier_counts['Tier'] = pd.Categorical(tier_counts['Tier'], categories=tier_order, ordered=True)
-    tier_counts = tier_counts.sort_values('Tier')
+    # Scores, tiers and tier counts are precomputed once per weighting
+    try:
+        competitiveness = get_competitiveness_table(weights)
+    except ValueError:
+        st.warning("⚠️ At least one weight must be above zero - showing the default weighting.")
+        competitiveness = get_competitiveness_table()
+    tier_counts = competitiveness.tier_counts
 
     col1, col2 = st.columns([1, 2])
 
     with col1:
-        for _, row in tier_counts.iterrows():
-            st.metric(row['Tier'], row['Count'])
+        for tier, count in zip(tier_counts['Tier'], tier_counts['Count']):
+            st.metric(tier, count)
 
     with col2:
         fig_tiers = px.pie(
@@ -244,7 +228,7 @@ with tab2:
     # Top competitive universities
     st.markdown(f"<h3 style='color: {GOLD}; margin-top: 2rem;'>Top 20 Most Competitive Universities</h3>", unsafe_allow_html=True)
 
-    top_competitive = data_comp.nlargest(20, 'Competitiveness Score')[[
+    top_competitive = competitiveness.top(20)[[
         'University Name',
         'Country',
         'World Rank',
@@ -252,8 +236,9 @@ with tab2:
         'International Students Ratio Score',
         'Graduate Employment Rate Score',
         'Competitiveness Score',
-        'Tier'
-    ]].reset_index(drop=True)
+        'Tier',
+        'Percentile'
+    ]]
 
     st.dataframe(top_competitive, use_container_width=True, height=400)
 
@@ -3,12 +3,14 @@ Page 5: AI Assistant & Q&A
 Conversational AI assistant for personalized guidance
 """
 import streamlit as st
+import time
 from datetime import datetime
 
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parents[1]))
 
+from answer_bank import SUGGESTED_QUESTIONS, assistant_prompt
 from utils import (
     set_page_config,
     apply_custom_css,
@@ -16,6 +18,8 @@ from utils import (
     display_footer,
     initialize_session_state,
     get_gemini_model,
+    get_semantic_cache,
+    get_answer_bank,
     GOLD, BLUE_DARK, BLUE_MEDIUM, BLUE_LIGHT, WHITE, GOLD_LIGHT
 )
 
@@ -30,8 +34,10 @@ display_logo()
 st.markdown(f"<h1 style='color: {GOLD}; text-align: center;'>🤖 AI Assistant</h1>", unsafe_allow_html=True)
 st.markdown(f"<p style='color: {WHITE}; text-align: center; font-size: 1.1rem;'>Your personal guide for university application questions</p>", unsafe_allow_html=True)
 
-# Get Gemini model
+# Get Gemini model, and the answers to earlier questions shared by every session
 gemini_model = get_gemini_model()
+semantic_cache = get_semantic_cache()
+answer_bank = get_answer_bank()
 
 # Initialize chat history in session state
 if 'chat_history' not in st.session_state:
@@ -40,6 +46,9 @@ if 'chat_history' not in st.session_state:
 if 'assistant_context' not in st.session_state:
     st.session_state.assistant_context = ""
 
+if 'assistant_latencies' not in st.session_state:
+    st.session_state.assistant_latencies = []
+
 # Context setting
 with st.expander("⚙️ Set Context (Optional)", expanded=False):
     st.markdown(f"<p style='color: {WHITE};'>Provide context about your situation to get more personalized responses.</p>", unsafe_allow_html=True)
@@ -92,67 +101,66 @@ with st.expander("⚙️ Set Context (Optional)", expanded=False):
 # Suggested questions
 st.markdown(f"<h3 style='color: {GOLD};'>💡 Suggested Questions</h3>", unsafe_allow_html=True)
 
-suggested_questions = [
-    "What are the typical application deadlines for Fall 2026?",
-    "How important are extracurricular activities in university admissions?",
-    "What's the difference between need-based and merit-based scholarships?",
-    "How can I improve my chances of getting into a top university?",
-    "What should I include in my statement of purpose?",
-    "How do I choose between multiple university offers?",
-    "What are the visa requirements for international students in the US?",
-    "How can I find research opportunities as an undergraduate?",
-]
 
 col1, col2, col3, col4 = st.columns(4)
 columns = [col1, col2, col3, col4]
 
-for idx, question in enumerate(suggested_questions):
+# A clicked suggestion is sent like a typed question
+suggested_question = None
+for idx, question in enumerate(SUGGESTED_QUESTIONS):
     with columns[idx % 4]:
         if st.button(question, key=f"suggest_{idx}", use_container_width=True):
-            st.session_state.current_question = question
+            suggested_question = question
 
 # Chat interface
 st.markdown(f"<h3 style='color: {GOLD}; margin-top: 2rem;'>💬 Chat with AI Assistant</h3>", unsafe_allow_html=True)
 
-# Display chat history
-chat_container = st.container()
-
-with chat_container:
-    if st.session_state.chat_history:
-        for message in st.session_state.chat_history:
-            if message['role'] == 'user':
-                st.markdown(f"""
+# Chat bubble markup
+def message_html(message):
+    """Render one chat message as a styled bubble"""
+    if message['role'] == 'user':
+        return f"""
                 <div style='background-color: rgba(240, 194, 68, 0.1); border-left: 3px solid {GOLD}; padding: 1rem; margin: 1rem 0; border-radius: 5px;'>
                     <p style='color: {GOLD}; font-weight: bold; margin: 0;'>You</p>
                     <p style='color: {WHITE}; margin: 0.5rem 0 0 0;'>{message['content']}</p>
                     <p style='color: rgba(255,255,255,0.5); font-size: 0.8rem; margin: 0.5rem 0 0 0;'>{message['timestamp']}</p>
                 </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
+                """
+
+    meta = message['timestamp']
+    if message.get('prepared'):
+        meta += " · ⚡ prepared answer"
+    elif message.get('similar_to'):
+        meta += " · ⚡ answered instantly from a similar earlier question"
+    elif message.get('first_token_s') is not None:
+        meta += f" · first token in {message['first_token_s']:.2f}s"
+    return f"""
                 <div style='background-color: rgba(255, 255, 255, 0.05); border-left: 3px solid {WHITE}; padding: 1rem; margin: 1rem 0; border-radius: 5px;'>
                     <p style='color: {WHITE}; font-weight: bold; margin: 0;'>🤖 AI Assistant</p>
                     <div style='color: {WHITE}; margin: 0.5rem 0 0 0;'>{message['content']}</div>
-                    <p style='color: rgba(255,255,255,0.5); font-size: 0.8rem; margin: 0.5rem 0 0 0;'>{message['timestamp']}</p>
+                    <p style='color: rgba(255,255,255,0.5); font-size: 0.8rem; margin: 0.5rem 0 0 0;'>{meta}</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """
+
+# Display chat history
+chat_container = st.container()
+
+with chat_container:
+    if st.session_state.chat_history:
+        for message in st.session_state.chat_history:
+            st.markdown(message_html(message), unsafe_allow_html=True)
     else:
         st.info("👋 Hi! I'm your AI assistant. Ask me anything about university applications, admissions, scholarships, or student life!")
 
 # Chat input
 st.markdown("<br>", unsafe_allow_html=True)
 
-# Check if there's a suggested question selected
-if 'current_question' in st.session_state and st.session_state.current_question:
-    user_question = st.session_state.current_question
-    st.session_state.current_question = None  # Reset
-else:
-    user_question = st.text_area(
-        "Your question:",
-        placeholder="Type your question here... (e.g., How do I write a compelling personal statement?)",
-        height=100,
-        key="user_input"
-    )
+user_question = st.text_area(
+    "Your question:",
+    placeholder="Type your question here... (e.g., How do I write a compelling personal statement?)",
+    height=100,
+    key="user_input"
+)
 
 col1, col2, col3 = st.columns([1, 1, 1])
 
@@ -165,49 +173,91 @@ with col2:
 with col3:
     export_button = st.button("💾 Export Chat", key="export_btn", use_container_width=True)
 
+if suggested_question:
+    user_question, send_button = suggested_question, True
+
+cache_stats = semantic_cache.stats()
+if cache_stats['hits']:
+    st.caption(
+        f"⚡ {cache_stats['hits']} of {cache_stats['lookups']} questions ({cache_stats['hit_rate']:.0%}) "
+        "were answered instantly from similar earlier questions"
+    )
+
 # Handle send button
 if send_button and user_question:
     # Add user message to history
     timestamp = datetime.now().strftime("%I:%M %p")
-    st.session_state.chat_history.append({
+    user_message = {
         'role': 'user',
         'content': user_question,
         'timestamp': timestamp
-    })
+    }
+    st.session_state.chat_history.append(user_message)
+
+    # Show the question and an empty answer bubble that fills in as tokens arrive
+    with chat_container:
+        st.markdown(message_html(user_message), unsafe_allow_html=True)
+        answer_bubble = st.empty()
+
+    # Without a saved context, suggested questions have a prepared answer from the warm-up job
+    prepared = None if st.session_state.assistant_context else answer_bank.get(user_question)
+    if prepared:
+        st.session_state.chat_history.append({
+            'role': 'assistant',
+            'content': prepared,
+            'timestamp': timestamp,
+            'prepared': True
+        })
+        st.rerun()
+
+    # A question close enough to an earlier one (asked with the same context) reuses its answer
+    similar = semantic_cache.lookup(user_question, namespace=st.session_state.assistant_context)
+    if similar:
+        answer, similar_question, similarity = similar
+        st.session_state.chat_history.append({
+            'role': 'assistant',
+            'content': answer,
+            'timestamp': timestamp,
+            'similar_to': similar_question,
+            'similarity': similarity
+        })
+        st.rerun()
 
     # Generate response
     with st.spinner("🤔 Thinking..."):
         if gemini_model:
             try:
                 # Build context-aware prompt
-                if st.session_state.assistant_context:
-                    full_prompt = f"""
-                    Context: {st.session_state.assistant_context}
-
-                    Question: {user_question}
-
-                    Provide a helpful, detailed, and personalized response. Be encouraging but realistic.
-                    If the question is about specific universities or programs, provide factual information.
-                    If giving advice, be practical and actionable.
-                    """
-                else:
-                    full_prompt = f"""
-                    Question: {user_question}
+                full_prompt = assistant_prompt(user_question, st.session_state.assistant_context)
 
-                    Provide a helpful, detailed response about university applications, admissions, or student life.
-                    Be encouraging but realistic. Give practical, actionable advice.
-                    """
-
-                response = gemini_model.generate_content(full_prompt)
-                assistant_response = response.text
-
-                # Add assistant response to history
-                st.session_state.chat_history.append({
+                # Stream the answer; time-to-first-token is the latency users feel
+                assistant_message = {
                     'role': 'assistant',
-                    'content': assistant_response,
-                    'timestamp': timestamp
+                    'content': "",
+                    'timestamp': timestamp,
+                    'first_token_s': None
+                }
+                request_start = time.perf_counter()
+
+                for chunk in gemini_model.generate_content(full_prompt, stream=True):
+                    if assistant_message['first_token_s'] is None:
+                        assistant_message['first_token_s'] = time.perf_counter() - request_start
+                    assistant_message['content'] += chunk.text
+                    answer_bubble.markdown(
+                        message_html({**assistant_message, 'content': assistant_message['content'] + " ▌"}),
+                        unsafe_allow_html=True
+                    )
+
+                assistant_message['total_s'] = time.perf_counter() - request_start
+                st.session_state.assistant_latencies.append({
+                    'first_token_s': assistant_message['first_token_s'],
+                    'total_s': assistant_message['total_s']
                 })
 
+                # Commit the full answer to history once the stream completes
+                st.session_state.chat_history.append(assistant_message)
+                semantic_cache.add(user_question, assistant_message['content'], namespace=st.session_state.assistant_context)
+
                 st.rerun()
 
             except Exception as e:
@@ -0,0 +1,120 @@
+"""
+Level-of-detail helpers for large plots
+
+Plotly ships every point of a trace to the browser. Up to MAX_PLOT_POINTS the
+charts keep doing that; above it
+  - scatters draw a stratified, seeded sample (every group keeps some
+    points and the same data always gives the same sample), and callers
+    overlay the points that matter to the user at full fidelity;
+  - histograms are binned on the server and drawn as bars, so the payload
+    is one count per bin instead of one value per row;
+and figure JSON is kept under MAX_FIGURE_BYTES by halving the sample.
+
+Scatter3d traces already render with WebGL, so nothing switches trace type.
+
+Both limits can be overridden per process with the UNI_INSIGHTS_MAX_PLOT_POINTS
+and UNI_INSIGHTS_MAX_FIGURE_BYTES environment variables.
+"""
+import os
+
+import numpy as np
+
+from lazy_imports import lazy_module
+
+go = lazy_module("plotly.graph_objects")
+
+MAX_PLOT_POINTS = int(os.getenv("UNI_INSIGHTS_MAX_PLOT_POINTS", "20000"))
+MAX_FIGURE_BYTES = int(os.getenv("UNI_INSIGHTS_MAX_FIGURE_BYTES", str(4 * 1024 * 1024)))
+
+# Smallest sample kept from any non-empty group, so sparse clusters stay visible
+MIN_POINTS_PER_GROUP = 50
+
+# Most bars a server-binned histogram draws
+MAX_HISTOGRAM_BINS = 100
+
+SAMPLE_SEED = 42
+
+
+def sample_positions(groups, max_points, seed=SAMPLE_SEED):
+    """
+    Stratified sample of row positions.
+
+    Each group keeps a share of max_points proportional to its size, but at
+    least MIN_POINTS_PER_GROUP rows (or all of them, if it is smaller).
+
+    Args:
+        groups: Group label of every row (e.g. cluster labels)
+        max_points: Approximate number of positions to keep
+        seed: Random seed; the same inputs always give the same sample
+
+    Returns:
+        Sorted array of row positions; all rows if there are at most max_points
+    """
+    groups = np.asarray(groups)
+    n_rows = len(groups)
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+
+    rng = np.random.default_rng(seed)
+    order = np.argsort(groups, kind="stable")
+    _, starts, counts = np.unique(groups[order], return_index=True, return_counts=True)
+    quotas = np.minimum(counts, np.maximum(MIN_POINTS_PER_GROUP, counts * max_points // n_rows))
+
+    kept = [
+        np.sort(rng.choice(order[start:start + count], size=quota, replace=False))
+        for start, count, quota in zip(starts, counts, quotas)
+    ]
+    return np.sort(np.concatenate(kept))
+
+
+def capped_figure_json(build, n_rows, max_points=MAX_PLOT_POINTS, max_bytes=MAX_FIGURE_BYTES):
+    """
+    Serialize a figure, halving its point budget until the JSON fits.
+
+    Args:
+        build: Callable taking a point budget and returning a plotly Figure
+        n_rows: Number of rows the figure would draw at full detail
+        max_points: Initial point budget
+        max_bytes: Upper bound on the JSON size
+
+    Returns:
+        Figure JSON string (the smallest budget's, if even that does not fit)
+    """
+    budget = min(n_rows, max_points)
+    while True:
+        figure_json = build(budget).to_json()
+        if len(figure_json) <= max_bytes or budget <= MIN_POINTS_PER_GROUP:
+            return figure_json
+        budget //= 2
+
+
+def histogram_trace(values, max_points=MAX_PLOT_POINTS, **trace_kwargs):
+    """
+    Histogram trace that is binned on the server above max_points.
+
+    Args:
+        values: Values to histogram (NaNs are ignored)
+        max_points: Largest number of raw values sent to the browser
+        **trace_kwargs: Passed to the trace, e.g. name and marker_color
+
+    Returns:
+        go.Histogram of the raw values, or a go.Bar of precomputed bin counts
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) <= max_points:
+        return go.Histogram(x=values, **trace_kwargs)
+
+    values = values[~np.isnan(values)]
+    edges = np.histogram_bin_edges(values, bins="auto")
+    if len(edges) - 1 > MAX_HISTOGRAM_BINS:
+        edges = np.histogram_bin_edges(values, bins=MAX_HISTOGRAM_BINS)
+    counts, edges = np.histogram(values, bins=edges)
+    widths = np.diff(edges)
+    return go.Bar(
+        x=edges[:-1] + widths / 2,
+        y=counts,
+        width=widths,
+        hovertemplate="%{customdata[0]:.1f} - %{customdata[1]:.1f}: %{y}<extra></extra>",
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        **trace_kwargs
+    )
@@ -0,0 +1,23 @@
+"""
+Recommendation engine for the University Insights App
+
+Pure Python (no Streamlit): the pages, app.py and offline tools all call
+Recommender.recommend / recommend_many.
+"""
+from recommender.clustering import (
+    ENCODED_COLUMNS,
+    MISSING_LEVEL,
+    NUM_CLUSTERS,
+    SCORE_COLUMNS,
+    TOP_N,
+    ClusterModel,
+    RecommendationTable,
+    encode_scores,
+    lexicographic_rank,
+    load_or_fit_cluster_model,
+    top_k
+)
+from recommender.countries import COUNTRY_ALIASES, REGION_ALIASES, CountryIndex, normalize_country
+from recommender.engine import MATCH_MODES, Recommendation, Recommender
+from recommender.features import PreferenceExtractor, extract_features, extract_many
+from recommender.neighbors import NearestNeighborIndex
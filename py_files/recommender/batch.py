@@ -0,0 +1,254 @@
+"""
+Offline batch matching of student profiles
+
+Streams a CSV or JSONL file of profiles through the same Recommender the
+Discovery page uses and writes one recommendation per profile as it goes.
+Each profile is either free text (a "text" field, parsed with the
+engine's PreferenceExtractor) or the four fields "Country", "Academic Reputation Score",
+"International Students Ratio Score" and "Graduate Employment Rate Score";
+explicit fields override anything found in the text. An optional "id" field
+is carried through to the output.
+
+Input is read in chunks that are matched in a process pool. At most a fixed
+window of chunks is in flight and results are written in input order, so
+peak memory depends on the chunk size and worker count, not on the input.
+
+Run from py_files:
+    python -m recommender.batch profiles.csv -o recommendations.jsonl
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from dataset_store import DATASET_CSV_PATH
+from recommender.clustering import SCORE_COLUMNS, TOP_N
+from recommender.engine import MATCH_MODES, Recommender
+
+DEFAULT_CHUNK_SIZE = 2000
+
+PROFILE_FIELDS = ["Country"] + SCORE_COLUMNS
+OUTPUT_FIELDS = ["id", "cluster", "country_matched", "universities", "error"]
+
+# One engine per worker process, built by the pool initializer
+_recommender = None
+
+
+def _init_worker(csv_path):
+    """Load the engine once per worker; the dataset is memory-mapped, not copied"""
+    global _recommender
+    _recommender = Recommender.from_csv(csv_path)
+
+
+def read_profiles(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily read profiles in chunks.
+
+    Args:
+        path: CSV or JSONL file ("-" reads JSONL from stdin)
+        chunk_size: Profiles per chunk
+
+    Yields:
+        Lists of profile dictionaries
+    """
+    if str(path).endswith(".csv"):
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype={"id": str}):
+            yield chunk.to_dict("records")
+        return
+
+    handle = sys.stdin if str(path) == "-" else open(path, encoding="utf-8")
+    try:
+        lines = (line for line in handle if line.strip())
+        while True:
+            chunk = [json.loads(line) for line in itertools.islice(lines, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def profile_preferences(profile, extracted=None):
+    """
+    Turn one input profile into a preference dictionary.
+
+    Args:
+        profile: Input profile
+        extracted: Preferences already extracted from the profile's text
+
+    Returns:
+        Preference dictionary, or None if a score is not a number
+    """
+    preferences = dict(extracted) if extracted is not None else dict.fromkeys(PROFILE_FIELDS)
+
+    for field in PROFILE_FIELDS:
+        value = _value(profile.get(field))
+        if value is not None:
+            preferences[field] = value
+
+    try:
+        for column in SCORE_COLUMNS:
+            if preferences[column] is not None:
+                preferences[column] = float(preferences[column])
+    except (TypeError, ValueError):
+        return None
+    if preferences["Country"] is not None:
+        preferences["Country"] = str(preferences["Country"])
+    return preferences
+
+
+def match_chunk(profiles, start, k=TOP_N, recommender=None, mode="cluster", weights=None):
+    """
+    Match one chunk of profiles.
+
+    Args:
+        profiles: List of profile dictionaries
+        start: Input row number of the first profile (the default id)
+        k: Universities per recommendation
+        recommender: Engine to use; defaults to this worker's engine
+        mode: One of MATCH_MODES
+        weights: Per-score weights for "nearest" mode
+
+    Returns:
+        List of output records, in input order
+    """
+    recommender = recommender or _recommender
+    names = recommender.data["University Name"].to_numpy(dtype=object)
+
+    # Free text is parsed for the whole chunk in one batch
+    texts = [_value(profile.get("text")) for profile in profiles]
+    with_text = [row for row, text in enumerate(texts) if text is not None]
+    extracted = [None] * len(profiles)
+    for row, features in zip(with_text, recommender.extractor.extract_many(str(texts[row]) for row in with_text)):
+        extracted[row] = features
+
+    preferences = [profile_preferences(profile, features) for profile, features in zip(profiles, extracted)]
+    parsed = [p for p in preferences if p is not None]
+    recommendations = iter(recommender.recommend_many(parsed, k=k, skip_invalid=True, mode=mode, weights=weights))
+
+    records = []
+    for row, (profile, prefs) in enumerate(zip(profiles, preferences), start):
+        record = dict.fromkeys(OUTPUT_FIELDS)
+        record["id"] = _value(profile.get("id"))
+        if record["id"] is None:
+            record["id"] = row
+
+        recommendation = next(recommendations) if prefs is not None else None
+        if recommendation is None:
+            record["error"] = "Profile needs all three scores between 0 and 100"
+        else:
+            record["cluster"] = int(recommendation.cluster)
+            record["country_matched"] = recommendation.country_matched
+            record["universities"] = names[recommendation.positions].tolist()
+        records.append(record)
+    return records
+
+
+def run_batch(input_path, output, csv_path=None, k=TOP_N, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+              mode="cluster", weights=None):
+    """
+    Match every profile in a file, streaming each chunk's results to `output`.
+
+    Args:
+        input_path: CSV or JSONL profiles
+        output: Callable taking each chunk's list of output records
+        csv_path: Dataset CSV; defaults to the clean QS dataset
+        k: Universities per recommendation
+        chunk_size: Profiles per chunk
+        workers: Worker processes; 0 matches in this process
+        mode: One of MATCH_MODES
+        weights: Per-score weights for "nearest" mode
+
+    Returns:
+        Number of profiles processed
+    """
+    csv_path = csv_path or DATASET_CSV_PATH
+    chunks = read_profiles(input_path, chunk_size)
+    offsets = itertools.accumulate(itertools.chain([0], itertools.repeat(chunk_size)))
+    processed = 0
+
+    if workers == 0:
+        recommender = Recommender.from_csv(csv_path)
+        for profiles, start in zip(chunks, offsets):
+            output(match_chunk(profiles, start, k, recommender, mode, weights))
+            processed += len(profiles)
+        return processed
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csv_path,)) as pool:
+        # Bounded window: never read further ahead than the pool can work on
+        in_flight = deque()
+        for profiles, start in zip(chunks, offsets):
+            in_flight.append((len(profiles), pool.submit(match_chunk, profiles, start, k, None, mode, weights)))
+            if len(in_flight) >= 2 * workers:
+                size, future = in_flight.popleft()
+                output(future.result())
+                processed += size
+        while in_flight:
+            size, future = in_flight.popleft()
+            output(future.result())
+            processed += size
+    return processed
+
+
+def jsonl_writer(handle):
+    """Output callable writing one JSON object per line"""
+    def write(records):
+        handle.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    return write
+
+
+def csv_writer(handle):
+    """Output callable writing CSV rows, universities joined with ' | '"""
+    writer = csv.DictWriter(handle, fieldnames=OUTPUT_FIELDS)
+    writer.writeheader()
+
+    def write(records):
+        for record in records:
+            writer.writerow({**record, "universities": " | ".join(record["universities"] or [])})
+    return write
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match student profiles to universities offline")
+    parser.add_argument("input", help="CSV or JSONL of profiles ('-' for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output .jsonl or .csv ('-' for JSONL on stdout)")
+    parser.add_argument("-k", type=int, default=TOP_N, help="Universities per profile")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Profiles per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 runs in-process)")
+    parser.add_argument("--mode", choices=MATCH_MODES, default="cluster", help="Cluster match or nearest raw scores")
+    parser.add_argument("--weights", type=float, nargs=len(SCORE_COLUMNS), default=None,
+                        metavar="W", help="Per-score weights for --mode nearest")
+    parser.add_argument("--dataset", type=Path, default=None, help="Dataset CSV to match against")
+    args = parser.parse_args(argv)
+
+    handle = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        write = csv_writer(handle) if args.output.endswith(".csv") else jsonl_writer(handle)
+        processed = run_batch(
+            args.input, write, args.dataset, args.k, args.chunk_size, args.workers, args.mode, args.weights
+        )
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    print(f"Matched {processed:,} profiles", file=sys.stderr)
+
+
+def _value(value):
+    """None for missing values, including NaN from CSV input"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+if __name__ == "__main__":
+    main()
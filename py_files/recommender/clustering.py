@@ -0,0 +1,272 @@
+"""
+Score encoding and the clustering artifact store
+
+The KMeans model behind Discovery & Matching is fitted once per dataset
+version and persisted next to the clean CSV, so a search only costs a predict.
+"""
+import itertools
+import os
+from pathlib import Path
+
+import numpy as np
+
+from dataset_store import file_hash
+from lazy_imports import lazy_module
+
+# Only needed to refit, which happens once per dataset version
+sklearn_cluster = lazy_module("sklearn.cluster")
+
+NUM_CLUSTERS = 25
+RANDOM_STATE = 42
+NUM_LEVELS = 5
+TOP_N = 5
+
+SCORE_COLUMNS = [
+    "Academic Reputation Score",
+    "International Students Ratio Score",
+    "Graduate Employment Rate Score"
+]
+
+# Inner edges of the [0, 20, 40, 60, 80, 100] bins (Very Low .. Very High)
+SCORE_BIN_EDGES = np.array([20.0, 40.0, 60.0, 80.0])
+SCORE_MIN, SCORE_MAX = 0.0, 100.0
+MISSING_LEVEL = -1
+
+ENCODED_COLUMNS = [
+    "Academic Reputation Score Encoded",
+    "International Students Ratio Score Encoded",
+    "Graduate Employment Rate Score Encoded"
+]
+
+
+def encode_scores(scores, columns=SCORE_COLUMNS):
+    """
+    Bin raw scores into the five levels 0 (Very Low) to 4 (Very High) in one pass.
+
+    Bins are right-closed with the lowest included, matching
+    pd.cut(bins=[0, 20, 40, 60, 80, 100], include_lowest=True).
+
+    Args:
+        scores: DataFrame holding `columns`, or an (n_rows, n_scores) array-like
+        columns: Score columns to read when `scores` is a DataFrame
+
+    Returns:
+        int8 array of shape (n_rows, n_scores); MISSING_LEVEL where a score is
+        NaN or outside 0-100
+    """
+    if hasattr(scores, "columns"):
+        # Read each column as a view instead of copying the frame into a 2-D block
+        score_columns = [scores[column].to_numpy(dtype=np.float64) for column in columns]
+    else:
+        score_columns = np.asarray(scores, dtype=np.float64).T
+
+    # Column-major so each score's levels are contiguous while being filled
+    levels = np.empty((len(score_columns[0]), len(score_columns)), dtype=np.int8, order="F")
+    for i, values in enumerate(score_columns):
+        # One comparison per inner edge, accumulated straight into the int8 level
+        level = levels[:, i]
+        level[:] = 0
+        for edge in SCORE_BIN_EDGES:
+            level += values > edge
+        level[~((values >= SCORE_MIN) & (values <= SCORE_MAX))] = MISSING_LEVEL
+    return levels
+
+
+def artifact_path(csv_path):
+    """Location of the persisted clustering artifact for a dataset CSV"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}.kmeans{NUM_CLUSTERS}.npz")
+
+
+class ClusterModel:
+    """
+    Fitted KMeans centroids and training labels for one dataset version.
+
+    Args:
+        centroids: (n_clusters, n_features) array of cluster centres
+        labels: cluster id of every row in the dataset, in row order
+        dataset_hash: SHA-256 of the CSV the model was fitted on
+    """
+
+    def __init__(self, centroids, labels, dataset_hash):
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.dataset_hash = dataset_hash
+
+    @property
+    def n_clusters(self):
+        return len(self.centroids)
+
+    def predict(self, features):
+        """
+        Assign each feature row to its nearest centroid (same rule as KMeans.predict).
+
+        Args:
+            features: array-like of shape (n_samples, n_features)
+
+        Returns:
+            Array of cluster ids
+        """
+        features = np.asarray(features, dtype=np.float64).reshape(-1, self.centroids.shape[1])
+        if np.isnan(features).any():
+            raise ValueError("Input contains NaN")
+        distances = ((features[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def save(self, path):
+        """Write the model atomically so concurrent readers never see a partial file"""
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as handle:
+            np.savez(
+                handle,
+                centroids=self.centroids,
+                labels=self.labels,
+                dataset_hash=np.array(self.dataset_hash)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls(artifact["centroids"], artifact["labels"], str(artifact["dataset_hash"]))
+
+
+def fit_cluster_model(encoded_features, dataset_hash):
+    """Fit KMeans on the encoded score columns"""
+    kmeans = sklearn_cluster.KMeans(n_clusters=NUM_CLUSTERS, random_state=RANDOM_STATE)
+    labels = kmeans.fit_predict(encoded_features)
+    return ClusterModel(kmeans.cluster_centers_, labels, dataset_hash)
+
+
+def load_or_fit_cluster_model(csv_path, encoded_features):
+    """
+    Load the persisted model for this dataset, refitting only when the CSV changed.
+
+    Args:
+        csv_path: Path of the dataset CSV the features were derived from
+        encoded_features: (n_rows, 3) array of encoded scores, in CSV row order
+
+    Returns:
+        ClusterModel
+    """
+    dataset_hash = file_hash(csv_path)
+    path = artifact_path(csv_path)
+
+    if path.exists():
+        try:
+            model = ClusterModel.load(path)
+            if model.dataset_hash == dataset_hash and len(model.labels) == len(encoded_features):
+                return model
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable or stale artifact - refit below
+
+    model = fit_cluster_model(encoded_features, dataset_hash)
+    try:
+        model.save(path)
+    except OSError:
+        pass  # Read-only deployments still get the in-memory model
+    return model
+
+
+def lexicographic_rank(scores):
+    """
+    Composite sort key for ranking universities by the three scores, descending.
+
+    Ties keep dataset order (np.lexsort is stable), matching
+    DataFrame.sort_values(ascending=False) on the three columns.
+
+    Args:
+        scores: (n_rows, 3) array of the raw SCORE_COLUMNS
+
+    Returns:
+        int array where rank[i] is row i's position in the full ranking (0 = best)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.lexsort((-scores[:, 2], -scores[:, 1], -scores[:, 0]))
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    return rank
+
+
+def top_k(candidates, rank, k):
+    """
+    The k best candidates by a precomputed rank, without sorting all of them.
+
+    argpartition selects the k smallest ranks in linear time; only those k are
+    then sorted, so the cost is O(n + k log k) instead of O(n log n).
+
+    Args:
+        candidates: Row positions to choose from
+        rank: Composite key from lexicographic_rank
+        k: Number of rows to return
+
+    Returns:
+        Row positions of the best min(k, len(candidates)) candidates, best first
+    """
+    candidates = np.asarray(candidates, dtype=np.intp)
+    if k <= 0:
+        return candidates[:0]
+    if k < len(candidates):
+        candidates = candidates[np.argpartition(rank[candidates], k - 1)[:k]]
+    return candidates[np.argsort(rank[candidates])]
+
+
+class RecommendationTable:
+    """
+    Precomputed answers for every possible encoded preference.
+
+    Each score is binned into NUM_LEVELS levels, so a user preference can only
+    map to NUM_LEVELS ** 3 encoded vectors. The cluster id and ranked top-N
+    universities for all of them are computed once, turning a search into a
+    dictionary lookup. Other k values and filtered candidate sets are answered
+    with top_k over the precomputed rank.
+
+    Args:
+        cluster_model: Fitted ClusterModel for the dataset
+        scores: (n_rows, 3) array of the raw SCORE_COLUMNS, in dataset row order
+        top_n: Number of universities kept per entry
+    """
+
+    def __init__(self, cluster_model, scores, top_n=TOP_N):
+        self.rank = lexicographic_rank(scores)
+
+        # Members in dataset order, grouped by cluster with one stable sort
+        labels = cluster_model.labels
+        by_cluster = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[by_cluster], np.arange(cluster_model.n_clusters + 1))
+        self._cluster_members = [
+            by_cluster[start:end] for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+        codes = list(itertools.product(range(NUM_LEVELS), repeat=len(SCORE_COLUMNS)))
+        clusters = cluster_model.predict(codes)
+        best = {int(cluster): self.top_k(int(cluster), top_n) for cluster in set(clusters)}
+        self._entries = {
+            code: (int(cluster), best[int(cluster)])
+            for code, cluster in zip(codes, clusters)
+        }
+        self.top_n = top_n
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, encoded):
+        """
+        Answer an encoded preference from the table.
+
+        Args:
+            encoded: The three encoded levels, in SCORE_COLUMNS order
+
+        Returns:
+            Tuple of (cluster id, row positions of the top-N universities)
+        """
+        return self._entries[tuple(int(level) for level in encoded)]
+
+    def cluster_members(self, cluster):
+        """Sorted row positions of every university in a cluster"""
+        return self._cluster_members[cluster]
+
+    def top_k(self, cluster, k):
+        """The k best universities in a cluster, best first"""
+        return top_k(self._cluster_members[cluster], self.rank, k)
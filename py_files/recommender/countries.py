@@ -0,0 +1,153 @@
+"""
+Inverted country index
+
+Maps every way a student might name a country - the dataset's own name, its
+two-letter code and common aliases such as "USA" or "America" - to the sorted
+row positions of that country's universities. Filtering by country is then a
+dictionary lookup plus an array intersection instead of a substring scan over
+every row.
+"""
+import re
+
+import numpy as np
+
+# Common names -> the dataset's country name
+COUNTRY_ALIASES = {
+    "usa": "United States",
+    "us": "United States",
+    "america": "United States",
+    "united states of america": "United States",
+    "states": "United States",
+    "uk": "United Kingdom",
+    "gb": "United Kingdom",
+    "great britain": "United Kingdom",
+    "britain": "United Kingdom",
+    "england": "United Kingdom",
+    "scotland": "United Kingdom",
+    "wales": "United Kingdom",
+    "northern ireland": "United Kingdom",
+    "china": "China (Mainland)",
+    "mainland china": "China (Mainland)",
+    "prc": "China (Mainland)",
+    "peoples republic of china": "China (Mainland)",
+    "hong kong": "Hong Kong SAR",
+    "macau": "Macau SAR",
+    "macao": "Macau SAR",
+    "korea": "South Korea",
+    "republic of korea": "South Korea",
+    "holland": "Netherlands",
+    "uae": "United Arab Emirates",
+    "emirates": "United Arab Emirates",
+    "russian federation": "Russia",
+    "iran": "Iran, Islamic Republic of",
+    "syria": "Syrian Arab Republic",
+    "palestine": "Palestinian Territory, Occupied",
+    "czechia": "Czech Republic",
+    "turkiye": "Turkey",
+    "viet nam": "Vietnam",
+    "deutschland": "Germany",
+    "brasil": "Brazil"
+}
+
+# Aliases that are also part of other places' names ("Latin America", "New South
+# Wales", "New England"): fine as a country filter, but not searched for in free text
+REGION_ALIASES = frozenset({"america", "states", "england", "wales"})
+
+# Partial names shorter than this only match exactly (so "us" never hits "Russia")
+MIN_PARTIAL_LENGTH = 4
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_country(name):
+    """Lower-case, drop punctuation and a leading "the", collapse whitespace"""
+    name = _WHITESPACE.sub(" ", _PUNCTUATION.sub("", str(name).lower())).strip()
+    return name[4:] if name.startswith("the ") else name
+
+
+class CountryIndex:
+    """
+    Country name, code and alias -> row positions.
+
+    Args:
+        data: Dataset with a "Country" column and, optionally, "Country Code";
+            without codes only names and aliases are indexed
+    """
+
+    def __init__(self, data):
+        self.n_rows = len(data)
+        self._positions = {}
+        self._masks = {}
+
+        # Group row positions by each distinct value with one stable sort
+        for column in ("Country", "Country Code"):
+            if column not in data:
+                continue
+            values = data[column].astype("string").fillna("").to_numpy(dtype=object)
+            order = np.argsort(values, kind="stable")
+            sorted_values = values[order]
+            starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+            for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+                key = normalize_country(sorted_values[start])
+                if key:
+                    self._add(key, order[start:end])
+
+        self.names = {
+            normalize_country(name): name
+            for name in data["Country"].dropna().unique()
+        }
+        for alias, name in COUNTRY_ALIASES.items():
+            key = normalize_country(name)
+            if key in self._positions:
+                self._add(alias, self._positions[key])
+
+    def _add(self, key, positions):
+        if key in self._positions:
+            positions = np.union1d(self._positions[key], positions)
+        self._positions[key] = np.sort(np.asarray(positions, dtype=np.intp))
+
+    def __contains__(self, country):
+        return self.lookup(country) is not None
+
+    def lookup(self, country):
+        """
+        Row positions of the universities in a country.
+
+        Exact names, codes and aliases are matched first; otherwise any
+        country whose name contains the query (at least MIN_PARTIAL_LENGTH
+        characters) is included.
+
+        Args:
+            country: Country name, code or alias, in any case
+
+        Returns:
+            Sorted array of row positions, or None if nothing matches
+        """
+        key = normalize_country(country)
+        positions = self._positions.get(key)
+        if positions is not None or len(key) < MIN_PARTIAL_LENGTH:
+            return positions
+
+        partial = [self._positions[name] for name in self.names if key in name]
+        return np.unique(np.concatenate(partial)) if partial else None
+
+    def mask(self, country):
+        """
+        Boolean mask over all rows for a country, or None if nothing matches.
+
+        Masks for exact names, codes and aliases are cached; treat them as read-only.
+        """
+        key = normalize_country(country)
+        if key in self._masks:
+            return self._masks[key]
+
+        positions = self.lookup(country)
+        if positions is None:
+            return None
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        if key in self._positions:
+            mask.flags.writeable = False
+            self._masks[key] = mask
+        return mask
@@ -0,0 +1,216 @@
+"""
+Headless university recommender
+
+Wraps the dataset, the persisted KMeans model and the precomputed preference
+table behind one object, so recommendations can be served, batched and
+benchmarked without Streamlit.
+"""
+import numpy as np
+
+from dataset_store import DATASET_CSV_PATH, load_dataset
+from recommender.clustering import (
+    MISSING_LEVEL,
+    SCORE_COLUMNS,
+    TOP_N,
+    RecommendationTable,
+    encode_scores,
+    load_or_fit_cluster_model,
+    top_k
+)
+from recommender.countries import CountryIndex
+from recommender.features import PreferenceExtractor
+from recommender.neighbors import NearestNeighborIndex
+
+# "cluster": best universities in the preference's KMeans cluster
+# "nearest": universities with the closest raw scores (KD-tree)
+MATCH_MODES = ("cluster", "nearest")
+
+
+class Recommendation:
+    """
+    Result of one recommendation.
+
+    Args:
+        cluster: Cluster the preference was assigned to
+        positions: Row positions of the recommended universities, best first
+        country_matched: False when a country was requested but none of the
+            cluster's universities are in it (the cluster's best are returned)
+        data: Dataset the positions index into
+        distances: Weighted score distance of each university ("nearest"
+            mode only)
+    """
+
+    def __init__(self, cluster, positions, country_matched, data, distances=None):
+        self.cluster = cluster
+        self.positions = positions
+        self.country_matched = country_matched
+        self.distances = distances
+        self._data = data
+
+    @property
+    def universities(self):
+        """The recommended rows of the dataset (built on access, so batch callers can skip it)"""
+        return self._data.iloc[self.positions]
+
+
+class Recommender:
+    """
+    Recommends universities whose scores cluster with, or lie closest to, a
+    user's preferences.
+
+    Args:
+        data: University dataset, in the row order the model was fitted on
+        cluster_model: Fitted ClusterModel for the dataset
+        top_n: Default number of universities per recommendation
+    """
+
+    def __init__(self, data, cluster_model, top_n=TOP_N):
+        self.data = data
+        self.cluster_model = cluster_model
+        self.top_n = top_n
+        self.table = RecommendationTable(cluster_model, data[SCORE_COLUMNS].to_numpy(), top_n)
+
+        self.countries = CountryIndex(data)
+        self._neighbors = None
+        self._extractor = None
+
+    @property
+    def extractor(self):
+        """Free-text preference extractor over this dataset's countries"""
+        if self._extractor is None:
+            self._extractor = PreferenceExtractor(self.data["Country"].dropna().unique())
+        return self._extractor
+
+    @property
+    def neighbors(self):
+        """KD-tree index over the raw scores, built on the first "nearest" query"""
+        if self._neighbors is None:
+            self._neighbors = NearestNeighborIndex(self.data[SCORE_COLUMNS].to_numpy())
+        return self._neighbors
+
+    @classmethod
+    def from_csv(cls, csv_path=DATASET_CSV_PATH, shared=None, top_n=TOP_N):
+        """
+        Load the dataset and its persisted model, refitting only when the CSV changed.
+
+        Args:
+            csv_path: Path of the clean dataset CSV
+            shared: Passed to dataset_store.load_dataset
+            top_n: Default number of universities per recommendation
+
+        Returns:
+            Recommender
+        """
+        data = load_dataset(csv_path, shared=shared)
+        cluster_model = load_or_fit_cluster_model(csv_path, encode_scores(data))
+        return cls(data, cluster_model, top_n)
+
+    def encode(self, preferences):
+        """
+        Encode one preference dictionary into its three score levels.
+
+        Raises:
+            ValueError: If a score is missing or outside 0-100
+        """
+        levels = encode_scores([[_score(preferences, column) for column in SCORE_COLUMNS]])[0]
+        if (levels == MISSING_LEVEL).any():
+            raise ValueError("Preferences need all three scores between 0 and 100")
+        return levels
+
+    def recommend(self, preferences, k=None, mode="cluster", weights=None):
+        """
+        Recommend the k best matching universities.
+
+        Args:
+            preferences: Dictionary with the three SCORE_COLUMNS and an optional
+                "Country" (a name, code or alias, see CountryIndex)
+            k: Number of universities to return; defaults to top_n
+            mode: One of MATCH_MODES
+            weights: Per-score weights for "nearest" mode, in SCORE_COLUMNS
+                order (None for equal weights)
+
+        Returns:
+            Recommendation
+
+        Raises:
+            ValueError: If a score is missing or outside 0-100, or the mode or
+                weights are invalid
+        """
+        _check_mode(mode)
+        return self._recommend(self.encode(preferences), preferences, k, mode, weights)
+
+    def recommend_many(self, list_of_preferences, k=None, skip_invalid=False, mode="cluster", weights=None):
+        """
+        Recommend for several preferences at once, encoding them in one pass.
+
+        Args:
+            list_of_preferences: Sequence of preference dictionaries
+            k: Number of universities per recommendation; defaults to top_n
+            skip_invalid: Return None for preferences with a missing or
+                out-of-range score instead of raising
+            mode: One of MATCH_MODES
+            weights: Per-score weights for "nearest" mode
+
+        Returns:
+            List of Recommendation (or None), in input order
+
+        Raises:
+            ValueError: If a preference has a missing or out-of-range score
+                and skip_invalid is False, or the mode or weights are invalid
+        """
+        _check_mode(mode)
+        list_of_preferences = list(list_of_preferences)
+        if not list_of_preferences:
+            return []
+
+        levels = encode_scores([
+            [_score(preferences, column) for column in SCORE_COLUMNS]
+            for preferences in list_of_preferences
+        ])
+        valid = ~(levels == MISSING_LEVEL).any(axis=1)
+        if not skip_invalid and not valid.all():
+            raise ValueError(f"Preferences at index {np.argmin(valid)} need all three scores between 0 and 100")
+
+        return [
+            self._recommend(encoded, preferences, k, mode, weights) if is_valid else None
+            for encoded, preferences, is_valid in zip(levels, list_of_preferences, valid)
+        ]
+
+    def _recommend(self, encoded, preferences, k, mode, weights):
+        k = self.top_n if k is None else k
+        country = preferences.get("Country")
+        cluster, positions = self.table.lookup(encoded)
+
+        if mode == "nearest":
+            allowed = self.countries.mask(country) if country else None
+            country_matched = not country or allowed is not None
+            point = [_score(preferences, column) for column in SCORE_COLUMNS]
+            distances, positions = self.neighbors.query([point], k, weights, allowed)
+            return Recommendation(cluster, positions[0], country_matched, self.data, distances[0])
+
+        if k != self.table.top_n:
+            positions = self.table.top_k(cluster, k)
+
+        country_matched = True
+        if country:
+            # Intersect the cluster with the country's rows through the cached row mask
+            country_mask = self.countries.mask(country)
+            members = self.table.cluster_members(cluster)
+            in_country = members[country_mask[members]] if country_mask is not None else members[:0]
+            if len(in_country):
+                positions = top_k(in_country, self.table.rank, k)
+            else:
+                country_matched = False
+
+        return Recommendation(cluster, positions, country_matched, self.data)
+
+
+def _check_mode(mode):
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode {mode!r}; expected one of {MATCH_MODES}")
+
+
+def _score(preferences, column):
+    """A preference score as a float, NaN when it was not given"""
+    value = preferences.get(column)
+    return np.nan if value is None else float(value)
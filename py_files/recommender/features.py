@@ -0,0 +1,219 @@
+"""
+Preference extraction from free-text descriptions
+
+All patterns are compiled once. Each score is located with a plain substring
+search for its keywords and read with one anchored match, and countries are
+found anywhere in the sentence by one regex compiled from a character trie of
+the dataset's country names and their aliases, so the engine walks shared
+prefixes ("united states", "united kingdom", ...) once instead of trying
+every name in turn.
+"""
+import difflib
+import re
+from functools import cached_property, lru_cache
+
+from dataset_store import DATASET_CSV_PATH, load_dataset
+from recommender.clustering import SCORE_MAX
+from recommender.countries import COUNTRY_ALIASES, MIN_PARTIAL_LENGTH, REGION_ALIASES, normalize_country
+
+# Keywords that introduce each score; the score is the first number after one
+SCORE_KEYWORDS = {
+    "Academic Reputation Score": ("academic",),
+    "International Students Ratio Score": ("international student", "diversity"),
+    "Graduate Employment Rate Score": ("employ",)
+}
+
+_KEYWORD_FIELDS = [
+    (keyword, len(keyword), field)
+    for field, keywords in SCORE_KEYWORDS.items()
+    for keyword in keywords
+]
+
+# "<keyword ...> [of|around|at least|: ...] <number>", without crossing into the next clause.
+# The whole number is read; one above SCORE_MAX is rejected rather than truncated
+_SCORE_VALUE = re.compile(r"[^\d.,;]{0,40}(\d+(?:\.\d+)?)")
+
+# "university in <country>" names the wanted country, even when another one is mentioned first
+_UNIVERSITY_IN = re.compile(r"universit(?:y|ies)\s+in\s+(?:the\s+)?")
+
+# A misspelt country after "university in" ("germny") must be this close to a known
+# name (difflib ratio); up to FUZZY_MAX_WORDS words are tried, longest first
+FUZZY_CUTOFF = 0.85
+FUZZY_MAX_WORDS = 4
+_PHRASE_WORDS = re.compile(r"[a-z]+(?:\s+[a-z]+){0,%d}" % (FUZZY_MAX_WORDS - 1))
+
+# Fallback for countries outside the dataset, so callers can say none were found
+_COUNTRY_PHRASE = re.compile(r"university in (?:the )?([A-Za-z\s]+?)(?:\s+with|\s+that)", re.IGNORECASE)
+
+# Two-letter aliases are only trusted in capitals ("US", not "let us")
+_CASE_SENSITIVE_ALIASES = {"US": "United States", "UK": "United Kingdom"}
+_CASE_SENSITIVE_PATTERN = re.compile(r"(?<!\w)(?:US|UK)(?!\w)")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _trie_regex(words):
+    """Regex alternation of `words`, factored through a character trie"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        alternation = "|".join(branches)
+        if "" in node:
+            return f"(?:{alternation})?"
+        return alternation if len(branches) == 1 else f"(?:{alternation})"
+
+    return build(trie)
+
+
+class PreferenceExtractor:
+    """
+    Extracts the country and the three score preferences from sentences.
+
+    Args:
+        country_names: Country names as they appear in the dataset
+    """
+
+    def __init__(self, country_names):
+        names = {normalize_country(name): name for name in country_names}
+        surface_forms = {str(name).lower(): name for name in names.values()}
+        for alias, name in COUNTRY_ALIASES.items():
+            if normalize_country(name) in names and len(alias) > 2 and alias not in REGION_ALIASES:
+                surface_forms[alias] = names[normalize_country(name)]
+
+        # Matched against the lower-cased sentence
+        self._countries = {_WHITESPACE.sub(" ", form): name for form, name in surface_forms.items()}
+        self._country_pattern = re.compile(r"(?<!\w)(?:" + _trie_regex(sorted(self._countries)) + r")(?!\w)")
+
+    def extract(self, sentence):
+        """
+        Extract preferences from one sentence.
+
+        Args:
+            sentence: e.g. "I want a university in the United States with a high
+                academic reputation of 90, international student diversity of 85
+                and good employment rates around 80."
+
+        Returns:
+            Dictionary of preferences; None for anything not mentioned. A country
+            from the dataset is returned under its dataset name. The country
+            after "university in" wins over others mentioned elsewhere.
+        """
+        features = {
+            "Country": None,
+            "Academic Reputation Score": None,
+            "International Students Ratio Score": None,
+            "Graduate Employment Rate Score": None
+        }
+
+        lowered = sentence.lower()
+        find, match_value = lowered.find, _SCORE_VALUE.match
+        for keyword, length, field in _KEYWORD_FIELDS:
+            if features[field] is not None:
+                continue
+            start = find(keyword)
+            while start != -1:
+                match = match_value(lowered, start + length)
+                if match and float(match.group(1)) <= SCORE_MAX:
+                    features[field] = float(match.group(1))
+                    break
+                start = find(keyword, start + 1)
+
+        features["Country"] = self._find_country(sentence, lowered)
+        return features
+
+    def _find_country(self, sentence, lowered):
+        if "universit" in lowered and (phrase := _UNIVERSITY_IN.search(lowered)):
+            if alias_match := _CASE_SENSITIVE_PATTERN.match(sentence, phrase.end()):
+                return _CASE_SENSITIVE_ALIASES[alias_match.group(0)]
+            if country_match := self._country_pattern.match(lowered, phrase.end()):
+                return self._country_name(country_match.group(0))
+            if country := self._fuzzy_country(lowered, phrase.end()):
+                return country
+            if phrase_match := _COUNTRY_PHRASE.search(sentence):
+                return phrase_match.group(1).strip()
+
+        # No usable phrase: the first country mentioned anywhere
+        country_match = self._country_pattern.search(lowered)
+        if ("US" in sentence or "UK" in sentence) and (alias_match := _CASE_SENSITIVE_PATTERN.search(sentence)):
+            if not country_match or alias_match.start() < country_match.start():
+                return _CASE_SENSITIVE_ALIASES[alias_match.group(0)]
+        return self._country_name(country_match.group(0)) if country_match else None
+
+    def _fuzzy_country(self, lowered, start):
+        """Dataset name of the known country closest to the words at start, or None"""
+        words_match = _PHRASE_WORDS.match(lowered, start)
+        words = words_match.group(0).split() if words_match else []
+        for n in range(len(words), 0, -1):
+            candidate = " ".join(words[:n])
+            if len(candidate) < MIN_PARTIAL_LENGTH:
+                break
+            close = difflib.get_close_matches(candidate, self._countries, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                return self._countries[close[0]]
+        return None
+
+    def _country_name(self, found):
+        """Dataset name of a lower-cased country match"""
+        return self._countries.get(found) or self._countries[_WHITESPACE.sub(" ", found)]
+
+    @cached_property
+    def _any_case_pattern(self):
+        # Matches in the original sentence, so spans line up with its characters
+        return re.compile(self._country_pattern.pattern, re.IGNORECASE)
+
+    def country_mentions(self, sentence):
+        """
+        Every country mentioned in a sentence, not just the first.
+
+        Returns:
+            (start, end, dataset name) spans of the sentence, in order
+        """
+        mentions = [
+            (match.start(), match.end(), self._country_name(match.group(0).lower()))
+            for match in self._any_case_pattern.finditer(sentence)
+        ]
+        mentions += [
+            (match.start(), match.end(), _CASE_SENSITIVE_ALIASES[match.group(0)])
+            for match in _CASE_SENSITIVE_PATTERN.finditer(sentence)
+        ]
+        return sorted(mentions)
+
+    def extract_many(self, sentences):
+        """Extract preferences from each sentence, in order"""
+        extract = self.extract
+        return [extract(sentence) for sentence in sentences]
+
+
+@lru_cache(maxsize=1)
+def default_extractor():
+    """Extractor over the clean dataset's countries, built on first use"""
+    return PreferenceExtractor(load_dataset(DATASET_CSV_PATH)["Country"].dropna().unique())
+
+
+def extract_features(sentence):
+    """
+    Extract the country and the three score preferences from natural language.
+
+    Args:
+        sentence: Free-text description of the ideal university
+
+    Returns:
+        Dictionary of preferences; None for anything not mentioned
+    """
+    return default_extractor().extract(sentence)
+
+
+def extract_many(sentences):
+    """Batch form of extract_features"""
+    return default_extractor().extract_many(sentences)
@@ -0,0 +1,114 @@
+"""
+Nearest-neighbour matching on the raw score columns
+
+Unlike the cluster match, the user's exact scores are kept: a KD-tree over
+the dataset's raw scores answers "the k universities closest to this
+preference" in logarithmic time. One tree is built on the unweighted scores;
+per-dimension weights are applied at query time by rescoring the tree's
+nearest candidates and widening the search until no unseen row can beat them.
+"""
+import numpy as np
+
+from lazy_imports import lazy_module
+
+spatial = lazy_module("scipy.spatial")
+
+
+def validate_weights(weights, n_dims):
+    """
+    Check per-dimension weights.
+
+    Args:
+        weights: Sequence of n_dims non-negative numbers, or None for equal weights
+        n_dims: Number of score dimensions
+
+    Returns:
+        Tuple of floats
+
+    Raises:
+        ValueError: If the weights are the wrong length, negative or all zero
+    """
+    if weights is None:
+        return (1.0,) * n_dims
+    weights = tuple(float(weight) for weight in weights)
+    if len(weights) != n_dims:
+        raise ValueError(f"Expected {n_dims} weights, got {len(weights)}")
+    if any(not weight >= 0 for weight in weights) or not any(weights):
+        raise ValueError("Weights must be non-negative and not all zero")
+    return weights
+
+
+class NearestNeighborIndex:
+    """
+    KD-tree index of the raw scores, queried by weighted Euclidean distance.
+
+    Args:
+        scores: (n_rows, n_dims) array of raw scores in dataset row order; rows
+            with a missing score are never returned
+    """
+
+    def __init__(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        self._rows = np.flatnonzero(~np.isnan(scores).any(axis=1))
+        self._scores = scores[self._rows]
+        self.n_dims = scores.shape[1]
+        self._tree = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def tree(self):
+        """The KD-tree over the unweighted scores, built on first use"""
+        if self._tree is None:
+            self._tree = spatial.KDTree(self._scores)
+        return self._tree
+
+    def query(self, points, k, weights=None, allowed=None):
+        """
+        Find the k nearest universities to each preference vector.
+
+        Args:
+            points: (n_points, n_dims) array-like of preference scores
+            k: Number of neighbours per point
+            weights: Per-dimension weights (None for equal weights)
+            allowed: Optional boolean mask over dataset rows; only allowed
+                rows are returned (fewer than k if fewer are allowed)
+
+        Returns:
+            Tuple of (distances, positions) lists, one array per point, nearest
+            first; distances are weighted, positions are dataset row positions
+        """
+        weights = np.asarray(validate_weights(weights, self.n_dims))
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.n_dims)
+        allowed_rows = None if allowed is None else np.asarray(allowed, dtype=bool)[self._rows]
+
+        k = min(k, len(self) if allowed_rows is None else int(allowed_rows.sum()))
+        if k == 0:
+            return [np.empty(0)] * len(points), [np.empty(0, dtype=np.intp)] * len(points)
+
+        if allowed_rows is None and (weights == weights[0]).all():
+            # Equal weights only scale the distances, so the tree's order is the answer
+            distances, indices = self.tree.query(points, k=k)
+            distances = np.asarray(distances).reshape(len(points), k) * np.sqrt(weights[0])
+            indices = np.asarray(indices).reshape(len(points), k)
+            return list(distances), [self._rows[row] for row in indices]
+
+        results = [self._query_weighted(point, k, np.sqrt(weights), allowed_rows) for point in points]
+        return [distances for distances, _ in results], [positions for _, positions in results]
+
+    def _query_weighted(self, point, k, scale, allowed_rows):
+        # A row outside the tree's nearest `width` is at least the last candidate's
+        # unweighted distance away, so at least min(scale) times that when weighted
+        bound_scale = scale.min()
+        width = k if bound_scale > 0 else len(self)  # A zero weight gives no bound: scan everything
+        while True:
+            width = min(width * 4, len(self))
+            distances, indices = self.tree.query(point, k=width)
+            distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+            if allowed_rows is not None:
+                indices = indices[allowed_rows[indices]]
+            weighted = np.sqrt((((self._scores[indices] - point) * scale) ** 2).sum(axis=1))
+            order = np.argsort(weighted, kind="stable")[:k]
+            if width == len(self) or (len(order) == k and weighted[order[-1]] <= bound_scale * distances[-1]):
+                return weighted[order], self._rows[indices[order]]
@@ -0,0 +1,253 @@
+"""
+In-memory semantic cache for AI Assistant questions
+
+Questions are embedded on the box with hashed word and character n-grams (no
+model, no network) and kept in a nearest-neighbour index; a new question
+whose cosine similarity to a cached one reaches the threshold is answered
+with the cached answer instead of a Gemini call.
+
+Bag-of-words similarity cannot tell "visa for the UK" from "visa for the US",
+so entities are matched exactly instead: countries (found by the
+recommender's PreferenceExtractor, so "US" and "the USA" agree), numbers,
+capitalized names and exam or degree acronyms must be the same in both
+questions, and only the remaining words (plus the acronyms) are embedded.
+Acronyms count whatever their case, so "GPA" and "gpa" agree. Words common to
+nearly every admissions question ("university", "student", ...) are
+down-weighted so the topic words decide the match.
+
+The threshold (UNI_INSIGHTS_SEMANTIC_THRESHOLD), size and TTL are tunable;
+answers are only shared between questions asked with the same context. If
+the country extractor cannot be built (e.g. the dataset is missing), the
+cache is skipped: every lookup misses and nothing is stored.
+"""
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from recommender.features import default_extractor
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = float(os.getenv("UNI_INSIGHTS_SEMANTIC_THRESHOLD", "0.8"))
+MAX_ENTRIES = int(os.getenv("UNI_INSIGHTS_SEMANTIC_MAX_ENTRIES", "2000"))
+TTL_SECONDS = int(os.getenv("UNI_INSIGHTS_SEMANTIC_TTL", 7 * 24 * 3600))
+
+# Hashed feature space: 8 KB per question, so MAX_ENTRIES questions take 16 MB
+EMBEDDING_DIM = 2 ** 11
+CHAR_NGRAM = 3
+CHAR_NGRAM_WEIGHT = 0.5
+
+STOPWORDS = frozenset("""
+a about advice all am an and any are as at be can could do does for from get give go had has have how i if
+in into is it its many me much my need of on or our please should so some tell than that the their there
+these this tip tips to vs want was way ways we what when where which who why will with would you your
+""".split())
+
+# Words most admissions questions share; they count for GENERIC_WEIGHT of a topic word
+GENERIC_TERMS = frozenset("""
+university universities college colleges school schools student students study studying studies
+requirement requirements require required apply applying application applications admission
+admissions international typical important best good top
+""".split())
+GENERIC_WEIGHT = 0.3
+
+# Exam, grade and degree acronyms: entities in any case, and still topic words
+ACRONYMS = frozenset("""
+act bsc gcse gmat gpa gre ib ielts lsat mba mcat msc phd sat toefl
+""".split())
+
+_CAPITALIZED = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][\w&'-]*")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_WORD = re.compile(r"[a-z]+")
+
+
+# Suffixes stripped so "choose"/"choosing" and "extracurricular"/"extracurriculars" agree
+_SUFFIXES = (("ies", "y"), ("ing", ""), ("es", ""), ("ed", ""), ("s", ""))
+
+
+def stem(word):
+    """Crude suffix stripping for words of 5+ letters, leaving at least 3 (and no final "e")"""
+    if len(word) < 5:
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 4 else word
+
+
+_GENERIC_STEMS = frozenset(map(stem, GENERIC_TERMS))
+
+
+def _hash(feature):
+    return zlib.crc32(feature.encode()) % EMBEDDING_DIM
+
+
+def analyze(question, extractor):
+    """
+    Split a question into its entities and its topic words.
+
+    Args:
+        question: The user's question
+        extractor: recommender PreferenceExtractor that finds the countries
+
+    Returns:
+        (entities, words): frozenset of canonical countries, numbers,
+        capitalized names and acronyms; list of lower-case non-stopword words
+    """
+    entities = set()
+    parts, end = [], 0
+    for start, stop, name in extractor.country_mentions(question):
+        entities.add(name.lower())
+        parts += [question[end:start], " "]
+        end = stop
+    text = "".join(parts) + question[end:]
+
+    entities.update(_NUMBER.findall(text))
+    entities.update(word.lower() for word in _CAPITALIZED.findall(text) if word != "I")
+    entities.update(ACRONYMS.intersection(_WORD.findall(text.lower())))
+
+    words = [
+        stem(word) for word in _WORD.findall(text.lower())
+        if word not in STOPWORDS and (word not in entities or word in ACRONYMS)
+    ]
+    return frozenset(entities), words
+
+
+def embed(words):
+    """L2-normalized hashed word + character n-gram vector of the topic words (None if there are none)"""
+    features = Counter()
+    for word in words:
+        weight = GENERIC_WEIGHT if word in _GENERIC_STEMS else 1.0
+        features[_hash("w:" + word)] += weight
+        padded = f"<{word}>"
+        grams = [padded[i:i + CHAR_NGRAM] for i in range(len(padded) - CHAR_NGRAM + 1)]
+        for gram in grams:
+            features[_hash("c:" + gram)] += weight * CHAR_NGRAM_WEIGHT / len(grams)
+
+    if not features:
+        return None
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector[list(features)] = list(features.values())
+    return vector / np.linalg.norm(vector)
+
+
+class SemanticCache:
+    """
+    Question -> answer cache matched by meaning rather than exact text.
+
+    Args:
+        threshold: Lowest cosine similarity answered from the cache
+        max_entries: Entries kept; the oldest are evicted first
+        ttl_seconds: Age after which an entry no longer matches
+        extractor: PreferenceExtractor that finds countries; the dataset's
+            default extractor, built on the first question, when omitted
+
+    Thread-safe; one instance is shared by every session of the process.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS,
+                 extractor=None):
+        self._extractor = extractor
+        self._extractor_failed = False
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Row i of _vectors belongs to _entries[i]; rows past len(_entries) are unused
+        self._vectors = np.zeros((min(64, max_entries), EMBEDDING_DIM), dtype=np.float32)
+        self._entries = []
+        self.lookups = 0
+        self.hits = 0
+
+    @property
+    def extractor(self):
+        """The country extractor, or None if it could not be built"""
+        if self._extractor is None and not self._extractor_failed:
+            try:
+                self._extractor = default_extractor()
+            except Exception as e:
+                self._extractor_failed = True
+                logger.warning("Semantic cache disabled, the country extractor could not be built: %s", e)
+        return self._extractor
+
+    def lookup(self, question, namespace=""):
+        """
+        The cached answer to the most similar earlier question, if it is similar enough.
+
+        Args:
+            question: The user's question
+            namespace: Partition of the cache, e.g. the user's saved context;
+                only entries stored under the same namespace match
+
+        Returns:
+            (answer, matched question, similarity), or None on a miss
+        """
+        extractor = self.extractor
+        if extractor is None:
+            with self._lock:
+                self.lookups += 1
+            return None
+        entities, words = analyze(question, extractor)
+        vector = embed(words)
+        with self._lock:
+            self.lookups += 1
+            if vector is None or not self._entries:
+                return None
+
+            similarities = self._vectors[:len(self._entries)] @ vector
+            cutoff = time.time() - self.ttl_seconds
+            for i in np.argsort(-similarities, kind="stable"):
+                if similarities[i] < self.threshold:
+                    break
+                entry = self._entries[i]
+                if entry["namespace"] == namespace and entry["entities"] == entities and entry["created"] >= cutoff:
+                    self.hits += 1
+                    return entry["answer"], entry["question"], float(similarities[i])
+        return None
+
+    def add(self, question, answer, namespace=""):
+        """Store an answer; questions without topic words are not cached, nor anything without an extractor"""
+        extractor = self.extractor
+        if extractor is None:
+            return
+        entities, words = analyze(question, extractor)
+        vector = embed(words)
+        if vector is None:
+            return
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the oldest quarter in one go rather than shifting rows on every add
+                keep = len(self._entries) - max(1, self.max_entries // 4)
+                self._vectors[:keep] = self._vectors[len(self._entries) - keep:len(self._entries)]
+                self._entries = self._entries[len(self._entries) - keep:]
+            if len(self._entries) == len(self._vectors):
+                grown = np.zeros((min(2 * len(self._vectors), self.max_entries), EMBEDDING_DIM), dtype=np.float32)
+                grown[:len(self._vectors)] = self._vectors
+                self._vectors = grown
+
+            self._vectors[len(self._entries)] = vector
+            self._entries.append({
+                "question": question,
+                "answer": answer,
+                "namespace": namespace,
+                "entities": entities,
+                "created": time.time()
+            })
+
+    def stats(self):
+        """Lookups, hits, hit rate and entries since the process started"""
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing of identical concurrent requests
+
+The first caller of a key becomes the leader and does the work; callers that
+arrive while it is in flight wait for it and share its result (or its error)
+instead of repeating the work. Once the leader finishes the key is released,
+so later callers start a new flight.
+"""
+import threading
+from collections import Counter
+
+# Longest a follower waits for a leader; the leader's own call has a shorter deadline
+FOLLOWER_TIMEOUT_SECONDS = 90.0
+
+
+class Flight:
+    """One in-flight call: its result or error once done"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def _finish(self, result, error):
+        if not self._done.is_set():
+            self.result, self.error = result, error
+            self._done.set()
+
+    def wait(self, timeout=FOLLOWER_TIMEOUT_SECONDS):
+        """
+        Block until the leader finishes.
+
+        Returns:
+            The leader's result
+
+        Raises:
+            The leader's error, or TimeoutError if it did not finish within timeout
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Identical request still in flight after {timeout:.0f}s")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Thread-safe table of in-flight calls by key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._counters = Counter()
+
+    def join(self, key):
+        """
+        Join the flight for key, starting one if there is none.
+
+        Returns:
+            (flight, leader): the leader must call finish() exactly once,
+            followers call flight.wait()
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters["followers"] += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self._counters["leaders"] += 1
+            return flight, True
+
+    def finish(self, key, flight, result=None, error=None):
+        """Release key and hand result (or error) to the followers; later calls are ignored"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight._finish(result, error)
+
+    def stats(self):
+        """Leaders (upstream calls), followers (calls saved) and keys in flight"""
+        with self._lock:
+            return {
+                "leaders": self._counters["leaders"],
+                "followers": self._counters["followers"],
+                "in_flight": len(self._flights)
+            }
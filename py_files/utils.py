@@ -1,13 +1,30 @@
 """
 Shared utilities and styling for the University Insights App
 """
+import io
+import re
+import sqlite3
 import streamlit as st
-import pandas as pd
-import numpy as np
 from pathlib import Path
-import PIL.Image
-import google.generativeai as genai
-from gemini_api import the_api_key
+from lazy_imports import lazy_module
+from dataset_store import DATASET_CSV_PATH, load_dataset
+from recommender import (
+    ENCODED_COLUMNS,
+    MISSING_LEVEL,
+    Recommender,
+    encode_scores,
+    load_or_fit_cluster_model
+)
+from gemini_cache import CachedGenerativeModel, ResponseCache
+from gemini_client import get_gemini_client
+from cluster_plot import cluster_figure_json
+from analytics import CompetitivenessTable
+from semantic_cache import SemanticCache
+from answer_bank import AnswerBank
+
+# Imported on first use, so pages that never need them do not load them
+np = lazy_module("numpy")
+Image = lazy_module("PIL.Image")
 
 # Brand colors - Optimized for accessibility and design balance
 BLUE_DARK = "#073763"      # Primary background
@@ -19,6 +36,10 @@ WHITE = "#FFFFFF"          # Text on dark backgrounds
 GRAY_LIGHT = "#FFFFFF"     # Changed to white for better visibility
 GRAY_MEDIUM = "#FFFFFF"    # Changed to white for better visibility
 
+LOGO_PATH = Path(__file__).parents[1] / 'images/UR&IA.png'
+# Display width (CSS px) of the logo thumbnail shown in narrow layouts
+LOGO_THUMBNAIL_WIDTH = 320
+
 def set_page_config(page_title="University Insights App"):
     """Configure the Streamlit page settings"""
     st.set_page_config(
@@ -28,9 +49,16 @@ def set_page_config(page_title="University Insights App"):
         initial_sidebar_state="expanded"
     )
 
-def apply_custom_css():
-    """Apply custom CSS styling with professional design and accessibility"""
-    st.markdown(f"""
+def _minify_css(css):
+    """Drop comments, indentation and blank lines; rules and their order are unchanged"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+# Theme stylesheet, built once at import. Every rerun of every page sends the
+# same bytes, so after the first run Streamlit's message cache replaces the
+# element with a hash reference (it only caches elements of at least
+# global.minCachedMessageSize, 10 KB by default - benchmarks/bench_css_payload.py).
+CUSTOM_CSS = _minify_css(f"""
     <style>
     /* Import Google Fonts for better typography */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -776,16 +804,58 @@ def apply_custom_css():
         }}
     }}
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
-def display_logo():
-    """Display the app logo"""
+def apply_custom_css():
+    """Apply custom CSS styling with professional design and accessibility"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+@st.cache_resource
+def load_logo():
+    """
+    Load the app logo once per server as ready-to-serve PNG bytes.
+
+    st.image passes PNG bytes that need no resizing straight to the media
+    file manager, so reruns neither decode nor re-encode the logo.
+
+    Returns:
+        Dictionary with the "full" logo (the source file's bytes, already the
+        smallest lossless encoding) and a "thumbnail" downscaled to twice
+        LOGO_THUMBNAIL_WIDTH, so it stays sharp on high-density phone screens
+    """
+    full = LOGO_PATH.read_bytes()
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(full)) as image:
+        width = min(2 * LOGO_THUMBNAIL_WIDTH, image.width)
+        # Area averaging keeps the flat colours flat; LANCZOS ringing doubles the PNG size
+        thumbnail = image.resize((width, round(image.height * width / image.width)), Image.BOX)
+    thumbnail.save(buffer, format="PNG", optimize=True)
+    return {"full": full, "thumbnail": buffer.getvalue()}
+
+def is_narrow_client():
+    """Whether the browser is a phone, where Streamlit stacks columns into one narrow column"""
     try:
-        logo_path = Path(__file__).parents[1] / 'images/UR&IA.png'
-        logo_image = PIL.Image.open(logo_path)
+        # MDN's recommended mobile test: "Mobi" anywhere in the user agent
+        return "Mobi" in (st.context.headers.get("User-Agent") or "")
+    except Exception:
+        return False  # No browser session (bare mode, tests)
+
+def display_logo(thumbnail=None):
+    """
+    Display the app logo.
+
+    Args:
+        thumbnail: Show the LOGO_THUMBNAIL_WIDTH px thumbnail instead of the
+            full logo; by default only on phones (see is_narrow_client)
+    """
+    try:
+        logo = load_logo()
+        if thumbnail if thumbnail is not None else is_narrow_client():
+            st.image(logo["thumbnail"], output_format="PNG", width=LOGO_THUMBNAIL_WIDTH)
+            return
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.image(logo_image, use_container_width=True)
+            st.image(logo["full"], output_format="PNG", use_container_width=True)
     except Exception as e:
         st.error(f"Logo not found: {e}")
 
@@ -797,72 +867,111 @@ def display_footer():
     </div>
     """, unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource
 def load_university_data():
-    """Load and cache the university dataset"""
+    """
+    Load and cache the university dataset.
+
+    Served from the memory-mapped columnar cache and shared by every session
+    (cache_resource, not cache_data, so it is never copied per rerun). The
+    frame is read-only; callers copy before adding columns.
+    """
     try:
-        csv_path = Path(__file__).parents[1] / 'datasets/clean/qs2023_worlduni_rank_cleandata.csv'
-        data = pd.read_csv(csv_path)
+        data = load_dataset(DATASET_CSV_PATH)
         return data
     except Exception as e:
         st.error(f"Error loading dataset: {e}")
         return None
 
 @st.cache_resource
-def get_gemini_model():
-    """Initialize and cache the Gemini model"""
+def get_recommender():
+    """
+    Build the recommendation engine once per process.
+
+    The persisted KMeans model is loaded (refitted only when the dataset CSV
+    changes) and the engine shares the cached dataset frame.
+    """
+    data = load_university_data()
+    if data is None:
+        return None
     try:
-        genai.configure(api_key=the_api_key)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        return model
+        cluster_model = load_or_fit_cluster_model(DATASET_CSV_PATH, encode_scores(data))
+        return Recommender(data, cluster_model)
     except Exception as e:
-        st.error(f"Error initializing Gemini: {e}")
+        st.error(f"Error loading clustering model: {e}")
+        return None
+
+@st.cache_resource(max_entries=32)
+def get_competitiveness_table(weights=None):
+    """
+    Competitiveness score, tier and percentile of every university.
+
+    Built once per weighting (the 32 most recent are kept) for the cached
+    dataset and shared by every session.
+
+    Args:
+        weights: Tuple of (score column, weight) pairs; None for the defaults
+    """
+    data = load_university_data()
+    if data is None:
         return None
+    return CompetitivenessTable(data, None if weights is None else dict(weights))
+
+def get_cluster_figure_json(recommender):
+    """
+    Base 3D cluster figure of the recommender's dataset as plotly JSON.
+
+    Built once per dataset and cluster model version and shared by every
+    session; pass it to cluster_plot.highlight_cluster per search.
+    """
+    model = recommender.cluster_model
+    return _cluster_figure_json(recommender, model.dataset_hash, model.n_clusters)
+
+@st.cache_resource
+def _cluster_figure_json(_recommender, dataset_hash, n_clusters):
+    # The leading underscore keeps the engine out of the cache key; the model version is the key
+    return cluster_figure_json(_recommender.data, _recommender.cluster_model.labels, n_clusters)
+
+@st.cache_resource
+def get_gemini_model():
+    """
+    The shared Gemini client (timeouts, retries, one connection), with identical
+    prompts served from the response cache. The SDK loads on the first call.
+    """
+    model = get_gemini_client()
+    try:
+        return CachedGenerativeModel(model, ResponseCache())
+    except (OSError, sqlite3.Error):
+        return model  # No writable cache location - call the client directly
+
+@st.cache_resource
+def get_semantic_cache():
+    """The process-wide semantic cache of AI Assistant answers, shared by every session"""
+    return SemanticCache()
+
+@st.cache_resource
+def get_answer_bank():
+    """The prepared answers to the AI Assistant's suggested questions (see answer_bank.py)"""
+    return AnswerBank()
 
 def recode_columns(data):
     """
     Encode score columns into categorical bins for clustering.
 
+    Adds the encoded columns to the frame in place. New code should call
+    recommender.encode_scores, which returns the levels as an int8 matrix
+    without touching the frame.
+
     Args:
         data: DataFrame with university data
 
     Returns:
-        DataFrame with encoded columns added
+        DataFrame with encoded columns added (NaN for missing scores)
     """
-    ranges = [0, 20, 40, 60, 80, 100]
-    labels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
-    map_dict = {
-        'Very Low': 0,
-        'Low': 1,
-        'Medium': 2,
-        'High': 3,
-        'Very High': 4
-    }
-
-    # Create encoded columns
-    data['Academic Reputation Score Encoded'] = pd.cut(
-        data['Academic Reputation Score'],
-        bins=ranges,
-        include_lowest=True,
-        labels=labels
-    )
-    data['International Students Ratio Score Encoded'] = pd.cut(
-        data['International Students Ratio Score'],
-        bins=ranges,
-        include_lowest=True,
-        labels=labels
-    )
-    data['Graduate Employment Rate Score Encoded'] = pd.cut(
-        data['Graduate Employment Rate Score'],
-        bins=ranges,
-        include_lowest=True,
-        labels=labels
-    )
-
-    # Map to numeric codes
-    data['Academic Reputation Score Encoded'] = data['Academic Reputation Score Encoded'].map(map_dict)
-    data['International Students Ratio Score Encoded'] = data['International Students Ratio Score Encoded'].map(map_dict)
-    data['Graduate Employment Rate Score Encoded'] = data['Graduate Employment Rate Score Encoded'].map(map_dict)
+    levels = encode_scores(data).astype(np.float64)
+    levels[levels == MISSING_LEVEL] = np.nan
+    for i, column in enumerate(ENCODED_COLUMNS):
+        data[column] = levels[:, i]
 
     return data
 